@@ -1,28 +1,416 @@
 #!/usr/bin/env python3
+import os
 import re
-import sys
 import json
+import bisect
+import string
+import logging
+import functools
+import itertools
 from abc import ABC, abstractmethod
 
+try:
+    # Optional: RE2 (google-re2) matches in linear time, with no catastrophic backtracking
+    import re2
+    # Patterns RE2 rejects fall back to re quietly instead of logging each one
+    _RE2_OPTIONS = re2.Options()
+    _RE2_OPTIONS.log_errors = False
+except (ImportError, AttributeError):
+    re2 = None
+
+# RE2 is opt-in (MEDILINK_RE2=1): it only takes patterns it matches exactly like re
+# does, and only on ASCII text (see _compile_linear)
+_USE_RE2 = re2 is not None and os.getenv('MEDILINK_RE2') == '1'
+
+try:
+    # Optional: Aho-Corasick automaton for multi-marker scans
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+logger = logging.getLogger(__name__)
+
+# Common report fields that do not count towards a parser's extracted results
+_META_FIELDS = frozenset({'Patient', 'Date', 'Doctor', 'Laboratory'})
+
+
+@functools.lru_cache(maxsize=4096)
+def _compile(pattern, flags=0):
+    """
+    Compile a regex pattern once and reuse it across reports.
+    Already compiled patterns are returned unchanged.
+    """
+    if not isinstance(pattern, str):
+        return pattern
+    return re.compile(pattern, flags)
+
+
+# What re's \s matches in ASCII text; RE2's \s leaves out \v and \x1c-\x1f
+_RE2_SPACE = r'\t\n\v\f\r \x1c-\x1f'
+
+# Escapes that mean the same to re and RE2 on ASCII text (outside and inside a class)
+_RE2_SAFE_ESCAPES = frozenset('dDwWbBAtnrfv')
+_RE2_SAFE_CLASS_ESCAPES = frozenset('dDwWtnrfv')
+
+
+def _re2_source(pattern):
+    """
+    Translate a re pattern into RE2 syntax that matches ASCII text exactly as re does,
+    or return None when the pattern uses something that cannot be guaranteed
+    (e.g. a non-multiline $, which re also matches before a final newline).
+    """
+    if '{,' in pattern:
+        # re reads {,n} as {0,n}; RE2 reads it as literal text
+        return None
+    multiline = re.match(r'\(\?[a-zA-Z]*m[a-zA-Z]*\)', pattern) is not None
+    out = []
+    in_class = False
+    class_start = 0
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            escape = pattern[i + 1:i + 2]
+            if escape == 's':
+                out.append(_RE2_SPACE if in_class else f'[{_RE2_SPACE}]')
+            elif escape == 'S' and not in_class:
+                out.append(f'[^{_RE2_SPACE}]')
+            elif escape and (not escape.isalnum()
+                             or escape in (_RE2_SAFE_CLASS_ESCAPES if in_class else _RE2_SAFE_ESCAPES)):
+                out.append(char + escape)
+            else:
+                # \x, \u, \N{...}, \Z, backreferences, octal escapes, ...
+                return None
+            i += 2
+            continue
+        if in_class:
+            if char == ']' and i > class_start:
+                in_class = False
+            elif char == '[' and pattern[i + 1:i + 2] in (':', '.', '='):
+                # RE2 reads [:alpha:] and friends as POSIX classes
+                return None
+        elif char == '[':
+            in_class = True
+            class_start = i + 1
+            if pattern[class_start:class_start + 1] == '^':
+                class_start += 1
+        elif char == '$' and not multiline:
+            return None
+        out.append(char)
+        i += 1
+    return ''.join(out)
+
+
+class _LinearPattern:
+    """
+    A pattern compiled for both engines: RE2 for ASCII text, where _re2_source made
+    it match exactly like re, and the re module for everything else.
+    """
+    __slots__ = ('_re', '_re2', 'pattern', 'flags', 'groups', 'groupindex')
+    
+    def __init__(self, compiled, linear):
+        self._re = compiled
+        self._re2 = linear
+        self.pattern = compiled.pattern
+        self.flags = compiled.flags
+        self.groups = compiled.groups
+        self.groupindex = compiled.groupindex
+    
+    def _engine(self, string):
+        return self._re2 if string.isascii() else self._re
+    
+    def search(self, string, *args):
+        return self._engine(string).search(string, *args)
+    
+    def match(self, string, *args):
+        return self._engine(string).match(string, *args)
+    
+    def fullmatch(self, string, *args):
+        return self._engine(string).fullmatch(string, *args)
+    
+    def finditer(self, string, *args):
+        return self._engine(string).finditer(string, *args)
+    
+    def findall(self, string, *args):
+        return self._engine(string).findall(string, *args)
+    
+    def __getattr__(self, name):
+        # sub, split, ... stay on re
+        return getattr(self._re, name)
+
+
+def _compile_linear(pattern, flags=0, use_re2=None):
+    """
+    Compile a pattern with the re module, paired with an RE2 version for ASCII text
+    when RE2 is enabled (MEDILINK_RE2=1, or use_re2=True) and can match it exactly
+    like re. RE2 has no lookaround or backreferences, and its \s, \d and $ differ
+    from re's; such patterns stay on re.
+    """
+    compiled = re.compile(pattern, flags)
+    if use_re2 is None:
+        use_re2 = _USE_RE2
+    if not use_re2 or re2 is None or flags & ~re.IGNORECASE:
+        return compiled
+    source = _re2_source(pattern)
+    if source is None:
+        return compiled
+    try:
+        linear = re2.compile(('(?i)' if flags & re.IGNORECASE else '') + source, options=_RE2_OPTIONS)
+    except re2.error:
+        return compiled
+    return _LinearPattern(compiled, linear)
+
+
+def _union_of(pattern_groups, lowercase=False):
+    """
+    Build one alternation that matches wherever any of the given pattern sources does.
+    With lowercase=True it is built for already-lowercased ASCII text and needs no
+    IGNORECASE flag; None is returned when some pattern cannot be rewritten safely
+    (see _lowercase_literals).
+    """
+    patterns = [pattern for patterns in pattern_groups for pattern in patterns]
+    if not lowercase:
+        return _compile_linear('|'.join(f'(?:{pattern})' for pattern in patterns), re.IGNORECASE)
+    
+    sources = [_lowercase_literals(pattern) for pattern in patterns]
+    if None in sources:
+        return None
+    return _compile_linear('|'.join(f'(?:{source})' for source in sources))
+
+
+# Escapes that match the same on lowercased text: character classes, anchors,
+# control characters (\b inside a class is a backspace)
+_CASELESS_ESCAPES = frozenset('dDsSwWbBAZntrfva')
+
+
+def _lowercase_escape(char):
+    """Return an escape's character unchanged if lowercasing cannot affect it, else None."""
+    if char in _CASELESS_ESCAPES or not (char.isalnum() or char == '_'):
+        return char
+    # \x41, \u..., \N{...}, back-references and unknown escapes
+    return None
+
+
+def _lowercase_class(source):
+    """
+    Lowercase a character class source ('[...]'), or return None if the lowercased
+    class would match lowercased ASCII text differently than the original does
+    under IGNORECASE (e.g. [A-z], which also covers '[' to '`').
+    """
+    chars = []
+    index = 0
+    while index < len(source):
+        char = source[index]
+        if char == '\\' and index + 1 < len(source):
+            escaped = _lowercase_escape(source[index + 1])
+            if escaped is None:
+                return None
+            chars.append(char + escaped)
+            index += 2
+        else:
+            chars.append(char.lower())
+            index += 1
+    lowered = ''.join(chars)
+    
+    try:
+        original = re.compile(source, re.IGNORECASE)
+        rewritten = re.compile(lowered)
+    except re.error:
+        return None
+    for code in range(128):
+        char = chr(code)
+        if bool(original.fullmatch(char)) != bool(rewritten.fullmatch(char.lower())):
+            return None
+    return lowered
+
+
+def _class_end(pattern, start):
+    """Index just past the character class opening at pattern[start], or None."""
+    index = start + 1
+    if index < len(pattern) and pattern[index] == '^':
+        index += 1
+    # A ']' right after the opening bracket is a literal
+    if index < len(pattern) and pattern[index] == ']':
+        index += 1
+    while index < len(pattern):
+        if pattern[index] == '\\':
+            index += 2
+        elif pattern[index] == ']':
+            return index + 1
+        else:
+            index += 1
+    return None
+
+
+def _lowercase_literals(pattern):
+    """
+    Lowercase a regex source so that, without IGNORECASE, it matches lowercased ASCII
+    text exactly as the original matches the text with IGNORECASE.
+    Escapes (\\S, \\D, ...), group names and inline flags are left untouched.
+    Returns None when the rewrite could change what matches: escapes that name a
+    character by code or refer to a group (\\x41, \\N{...}, \\1), classes whose
+    ranges depend on case, and characters IGNORECASE equates with an ASCII letter
+    (e.g. the Kelvin sign).
+    """
+    chars = []
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if char == '\\':
+            escaped = _lowercase_escape(pattern[index + 1]) if index + 1 < len(pattern) else None
+            if escaped is None:
+                return None
+            chars.append(char + escaped)
+            index += 2
+        elif char == '[':
+            end = _class_end(pattern, index)
+            lowered = _lowercase_class(pattern[index:end]) if end else None
+            if lowered is None:
+                return None
+            chars.append(lowered)
+            index = end
+        elif pattern.startswith('(?', index):
+            # Keep group names, group references and inline flags as written; a group
+            # that turns IGNORECASE off cannot be rewritten
+            match = re.match(r'\(\?(?:P<\w+>|P=\w+\)|\(\w+\)|<?[=!]|[>#]|[aiLmsux]*(?:-[msx]+)?[:)])', pattern[index:])
+            if match is None:
+                return None
+            chars.append(match.group())
+            index += match.end()
+        else:
+            if not char.isascii() and re.search(re.escape(char), string.ascii_letters, re.IGNORECASE):
+                return None
+            chars.append(char.lower())
+            index += 1
+    return ''.join(chars)
+
+
+@functools.lru_cache(maxsize=64)
+def _fused_basic_regex(compiled_fields, lowercase=False):
+    """
+    Fuse every basic field pattern into a single alternation so the text is scanned once.
+    With lowercase=True the regex is built for already-lowercased ASCII text and needs
+    no IGNORECASE flag.
+    Returns (regex, {group name: (field index, pattern index)}), or None if the
+    patterns cannot be combined (or, with lowercase=True, safely lowercased).
+    """
+    alternatives = []
+    groups = {}
+    for field_index, (_, _, patterns) in enumerate(compiled_fields):
+        for pattern_index, pattern in enumerate(patterns):
+            name = f'f{field_index}_{pattern_index}'
+            groups[name] = (field_index, pattern_index)
+            source = _lowercase_literals(pattern.pattern) if lowercase else pattern.pattern
+            if source is None:
+                return None
+            alternatives.append(f'(?P<{name}>{source})')
+    
+    if not alternatives:
+        return None
+    
+    try:
+        # Zero-width lookahead so a match never consumes text another pattern
+        # needs (e.g. 'Date:' inside 'Collection Date:')
+        regex = re.compile(f"(?=(?:{'|'.join(alternatives)}))", 0 if lowercase else re.IGNORECASE)
+    except re.error:
+        return None
+    return regex, groups
+
+
+@functools.lru_cache(maxsize=64)
+def _marker_scanner(markers):
+    """
+    Build a scanner that finds every occurrence of the given (lowercased) markers in one pass.
+    The scanner yields (offset, marker index) pairs; when several markers occur at the
+    same offset, at least the lowest index is reported.
+    """
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for index, marker in enumerate(markers):
+            if marker and marker not in automaton:
+                automaton.add_word(marker, index)
+        if len(automaton):
+            automaton.make_automaton()
+            return automaton.iter
+        return lambda text: iter(())
+    
+    regex = re.compile('(?=(' + ')|('.join(re.escape(marker) for marker in markers) + '))')
+    return lambda text: ((match.start(), match.lastindex - 1) for match in regex.finditer(text))
+
+
+def _parse_report(parser_cls, text, test_type_config):
+    """
+    Parse one report. Module-level so it can be sent to worker processes.
+    """
+    return parser_cls(text, test_type_config).parse()
+
+
 class BaseParser(ABC):
     """
     Base class for all report parsers.
     Provides common functionality for extracting basic information
     and handling test-specific parsing.
     """
-    
+
+    # Look for table headers and data rows, as (pattern, one row per line) pairs.
+    # Full-row layouts match once per line; the shorter "name value" layouts can
+    # appear several times on one line and are scanned with finditer.
+    _TABLE_ROW_SOURCES = (
+        # Pattern 1: Parameter | Result | Reference | Units | Status
+        (r'([A-Za-z\s\(\)]+?)\s*\|\s*([\d\.\-\+]+)\s*\|\s*([\d\.\-\+\s\<\>]+)\s*\|\s*([A-Za-z/%]+)\s*\|\s*([A-Z]+)', True),
+        # Pattern 2: Parameter Result Reference Units Status (space separated)
+        (r'([A-Za-z\s\(\)]+?)\s+([\d\.\-\+]+)\s+([\d\.\-\+\s\<\>]+)\s+([A-Za-z/%]+)\s+([A-Z]+)', True),
+        # Pattern 3: Simple Parameter: Value Unit pattern
+        (r'([A-Za-z\s\(\)]+?)[:\.]\s*([\d\.\-\+]+)\s*([A-Za-z/%]*)', False),
+        # Pattern 4: TSH specific patterns for thyroid tests
+        (r'(TSH|Free\s*T[34]|T[34][:T]*\s*Ratio|T[34]\s*Index)\s*[:\|\s]\s*([\d\.\-\+]+)\s*([A-Za-z/%]*)', False),
+        # Pattern 5: Lab values with units in parentheses
+        (r'([A-Za-z\s\(\)]+?)\s+([\d\.\-\+]+)\s*\(([A-Za-z/%]+)\)', False),
+    )
+    _TABLE_ROW_PATTERNS = tuple((_compile_linear(source, re.IGNORECASE), single) for source, single in _TABLE_ROW_SOURCES)
+
+    # Deletes what re.sub(r'[^\w\s\(\)]', '', name) would; table-row names only ever
+    # contain letters, whitespace, parentheses and ':'
+    _PARAM_NAME_TABLE = str.maketrans('', '', ''.join(
+        chr(code) for code in range(256) if re.fullmatch(r'[^\w\s\(\)]', chr(code))
+    ))
+
+    # Table header words that are never parameter names
+    _GENERIC_TABLE_NAMES = frozenset({'test', 'result', 'reference', 'units', 'status'})
+
+    # Compiled basic fields per configuration list, keyed by identity (see _specialize)
+    _SPECIALIZED_FIELDS = {}
+    _SPECIALIZED_FIELDS_MAX = 256
+
     def __init__(self, text, test_type_config=None):
         self.text = text
+        # Lowercased once so case-insensitive scans need neither IGNORECASE nor per-line lower()
+        self._text_lower = text.lower()
         self.test_type_config = test_type_config or {}
         self.report_data = {}
     
+    @functools.cached_property
+    def _lines(self):
+        """
+        Report text split into lines, shared by every extraction phase.
+        """
+        return self.text.split('\n')
+    
+    @functools.cached_property
+    def _lines_lower(self):
+        """
+        Lowercased counterpart of _lines for case-insensitive marker scans.
+        """
+        return self._text_lower.split('\n')
+    
     def parse(self):
         """
         Main parsing method that orchestrates the extraction process.
         """
-        print(f"=== {self.__class__.__name__} DEBUG ===", file=sys.stderr)
-        print(f"Input text length: {len(self.text)}", file=sys.stderr)
-        print("Raw text:", repr(self.text[:500]), file=sys.stderr)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("=== %s DEBUG ===", self.__class__.__name__)
+            logger.debug("Input text length: %d", len(self.text))
+            logger.debug("Raw text: %r", self.text[:500])
         
         # Extract basic information required for all reports
         self._extract_basic_information()
@@ -33,47 +421,167 @@ class BaseParser(ABC):
         # Validate results
         self._validate_results()
         
-        print(f"=== TOTAL EXTRACTED FIELDS: {len(self.report_data)} ===", file=sys.stderr)
+        logger.debug("=== TOTAL EXTRACTED FIELDS: %d ===", len(self.report_data))
         return self.report_data
     
+    @classmethod
+    def parse_many(cls, texts, test_type_config=None, workers=None):
+        """
+        Parse a batch of reports that share one test type configuration.
+        Reports run in parallel on worker processes (parsing is pure Python regex
+        work, which threads would serialize on the GIL).
+        Returns the parsed results in input order, the same as parsing each text.
+        """
+        texts = list(texts)
+        workers = min(workers or os.cpu_count() or 1, len(texts))
+        if workers < 2:
+            return [cls(text, test_type_config).parse() for text in texts]
+        
+        # Imported here so single-report callers don't pay for the executor modules
+        from concurrent.futures import ProcessPoolExecutor
+        
+        # Worker processes receive reports in chunks rather than one round trip each
+        chunksize = max(1, len(texts) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(
+                _parse_report, itertools.repeat(cls), texts, itertools.repeat(test_type_config),
+                chunksize=chunksize,
+            ))
+    
     def _extract_basic_information(self):
         """
         Extract basic information common to all lab reports.
         Uses configuration from test type if available.
         """
-        basic_fields = self.test_type_config.get('basic_fields', self._get_default_basic_fields())
+        basic_fields = self.test_type_config.get('basic_fields')
+        if basic_fields is None:
+            compiled_fields = self._DEFAULT_BASIC_FIELDS_COMPILED
+        else:
+            compiled_fields = self._specialize(basic_fields)
         
-        for field_config in basic_fields:
-            field_name = field_config['name']
-            patterns = field_config['patterns']
-            required = field_config.get('required', False)
-            
-            found = False
-            for pattern in patterns:
-                match = re.search(pattern, self.text, re.IGNORECASE)
+        located = self._locate_basic_fields(compiled_fields)
+        
+        for field_index, (field_name, required, patterns) in enumerate(compiled_fields):
+            if field_index in located:
+                pattern, match = located[field_index]
+                # Some legacy patterns (e.g. 'CENTRAL\s*MEDICAL\s*LABORATORY') have no capturing group.
+                # Use first capturing group if the pattern has one; otherwise the whole match.
+                # pattern.groups is fixed at compile time, unlike match.lastindex.
+                value = match.group(1) if pattern.groups else None
+                if value is None:
+                    value = match.group(0)
+                value = value.strip()
+                
+                # Special handling for laboratory field
+                if field_name == 'Laboratory' and 'CENTRAL' in pattern.pattern:
+                    value = 'Central Medical Laboratory'
+                
+                self.report_data[field_name] = value
+                logger.debug(" Found %s: %s", field_name, value)
+            elif required:
+                logger.warning("Required field '%s' not found", field_name)
+    
+    def _locate_basic_fields(self, compiled_fields):
+        """
+        Find the best match for each basic field, as searching each field's patterns
+        in turn would: a field's earlier patterns take priority over later ones, and
+        each pattern's first occurrence in the text is used.
+        Returns {field index: (pattern, match)}.
+        """
+        # ASCII text keeps its offsets when lowercased, so the flag-free lowercase
+        # regex can scan it; otherwise the IGNORECASE one scans the original text
+        fused = _fused_basic_regex(compiled_fields, lowercase=True) if self.text.isascii() else None
+        scan_text = self._text_lower
+        if fused is None:
+            fused = _fused_basic_regex(compiled_fields)
+            scan_text = self.text
+        if fused is None:
+            located = {}
+            for field_index, (_, _, patterns) in enumerate(compiled_fields):
+                for pattern in patterns:
+                    match = pattern.search(self.text)
+                    if match:
+                        located[field_index] = (pattern, match)
+                        break
+            return located
+        
+        regex, groups = fused
+        # The fused scan reports one alternative per offset: the first, in (field,
+        # pattern) order, that matches there. Every hit is kept, so alternatives it
+        # hid (another field's pattern matching at the same offset) are re-checked.
+        hits = []
+        best = {}
+        settled = 0
+        for hit in regex.finditer(scan_text):
+            reported = groups[hit.lastgroup]
+            hits.append((hit.start(), reported))
+            field_index, pattern_index = reported
+            current = best.get(field_index)
+            if current is None or pattern_index < current[0]:
+                best[field_index] = (pattern_index, hit.start())
+                if pattern_index == 0:
+                    settled += 1
+                    # Every field already has its highest-priority pattern
+                    if settled == len(compiled_fields):
+                        break
+        
+        located = {}
+        for field_index, (_, _, patterns) in enumerate(compiled_fields):
+            found = best.get(field_index)
+            last = found[0] if found else len(patterns) - 1
+            for pattern_index in range(last + 1):
+                pattern = patterns[pattern_index]
+                alternative = (field_index, pattern_index)
+                is_found = found is not None and pattern_index == found[0]
+                match = None
+                # Offsets where an earlier alternative may have hidden this pattern,
+                # before its first reported hit
+                for position, reported in hits:
+                    if is_found and position >= found[1]:
+                        break
+                    if reported < alternative:
+                        match = pattern.match(self.text, position)
+                        if match:
+                            break
+                if match is None and is_found:
+                    # Re-match on the original text so values keep their case
+                    match = pattern.match(self.text, found[1]) or pattern.search(self.text)
                 if match:
-                    # Some legacy patterns (e.g. 'CENTRAL\s*MEDICAL\s*LABORATORY') have no capturing group.
-                    # Use first capturing group if present; otherwise the whole match to avoid IndexError.
-                    try:
-                        if match.lastindex and match.lastindex >= 1:
-                            value = match.group(1).strip()
-                        else:
-                            value = match.group(0).strip()
-                    except IndexError:
-                        # Fallback defensively to full match
-                        value = match.group(0).strip()
-                    
-                    # Special handling for laboratory field
-                    if field_name == 'Laboratory' and 'CENTRAL' in pattern:
-                        value = 'Central Medical Laboratory'
-                    
-                    self.report_data[field_name] = value
-                    print(f" Found {field_name}: {value}", file=sys.stderr)
-                    found = True
+                    located[field_index] = (pattern, match)
                     break
-            
-            if not found and required:
-                print(f" Warning: Required field '{field_name}' not found", file=sys.stderr)
+        return located
+    
+    @classmethod
+    def _specialize(cls, basic_fields):
+        """
+        Resolve a basic_fields configuration to compiled patterns once per test type.
+        Configurations are long-lived, so the result is cached by identity; the cache
+        holds a reference to the configuration so its id cannot be reused meanwhile.
+        """
+        cache = BaseParser._SPECIALIZED_FIELDS
+        entry = cache.get(id(basic_fields))
+        if entry is not None and entry[0] is basic_fields:
+            return entry[1]
+        
+        compiled_fields = cls._compile_basic_fields(basic_fields)
+        if len(cache) >= cls._SPECIALIZED_FIELDS_MAX:
+            cache.clear()
+        cache[id(basic_fields)] = (basic_fields, compiled_fields)
+        return compiled_fields
+    
+    @staticmethod
+    def _compile_basic_fields(basic_fields):
+        """
+        Compile basic field configurations into (name, required, patterns) tuples.
+        """
+        return tuple(
+            (
+                field_config['name'],
+                field_config.get('required', False),
+                tuple(_compile(pattern, re.IGNORECASE) for pattern in field_config['patterns']),
+            )
+            for field_config in basic_fields
+        )
     
     def _get_default_basic_fields(self):
         """
@@ -135,14 +643,17 @@ class BaseParser(ABC):
             if field_name in reference_ranges:
                 range_config = reference_ranges[field_name]
                 # Add validation logic here if needed
-                print(f" Validated {field_name}: {field_value} (Range: {range_config.get('normalRange', 'N/A')})", file=sys.stderr)
+                logger.debug(" Validated %s: %s (Range: %s)", field_name, field_value, range_config.get('normalRange', 'N/A'))
     
     def _extract_numeric_value(self, text, patterns, unit=None):
         """
         Helper method to extract numeric values with optional units.
         """
         for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+            # Callers may pass precompiled patterns; only raw strings need compiling
+            if isinstance(pattern, str):
+                pattern = _compile(pattern, re.IGNORECASE)
+            match = pattern.search(text)
             if match:
                 value = match.group(1).strip()
                 
@@ -153,83 +664,151 @@ class BaseParser(ABC):
                 return value
         return None
     
+    def _extract_union(self, pattern_groups, union, lower_union=None):
+        """
+        Extract one value per pattern group in a single pass over the text.
+        
+        Each group keeps _extract_numeric_value's priority (the first pattern
+        that matches anywhere wins, at its leftmost match); the union only
+        locates the positions where some pattern can match. lower_union is the
+        optional lowercase counterpart of union (see _union_of).
+        """
+        text = self.text
+        pending = dict(enumerate(pattern_groups))
+        values = [None] * len(pending)
+        
+        # ASCII text keeps its offsets when lowercased, so the flag-free lowercase
+        # union can locate the candidates
+        scan_text = text
+        if lower_union is not None and text.isascii():
+            scan_text, union = self._text_lower, lower_union
+        
+        match = union.search(scan_text)
+        while match and pending:
+            position = match.start()
+            for index, patterns in list(pending.items()):
+                for priority, pattern in enumerate(patterns):
+                    hit = pattern.match(text, position)
+                    if hit:
+                        values[index] = hit.group(1).strip()
+                        # Only a higher-priority pattern can still replace this value
+                        if priority:
+                            pending[index] = patterns[:priority]
+                        else:
+                            del pending[index]
+                        break
+            match = union.search(scan_text, position + 1)
+        
+        return values
+    
     def _extract_tabular_data(self, lines, start_markers, value_patterns):
         """
         Helper method to extract data from tabular formats.
         """
         extracted_data = {}
+        if not start_markers:
+            return extracted_data
+        
+        marker_items = list(start_markers.items())
+        if lines is self._lines:
+            lines_lower = [line.strip() for line in self._lines_lower]
+        else:
+            lines_lower = [line.strip().lower() for line in lines]
+        line_starts = []
+        offset = 0
+        for line in lines_lower:
+            line_starts.append(offset)
+            offset += len(line) + 1
+        
+        # Single pass over the whole text: first marker (in configuration order) on each line
+        line_markers = {}
+        scan = _marker_scanner(tuple(marker.lower() for marker, _ in marker_items))
+        for position, marker_index in scan('\n'.join(lines_lower)):
+            i = bisect.bisect_right(line_starts, position) - 1
+            if marker_index < line_markers.get(i, len(marker_items)):
+                line_markers[i] = marker_index
         
+        # Stream the lines once, carrying markers still waiting for their value on the
+        # next two lines. A marker line never holds its own value, and a marker whose
+        # parameter is already filled is dropped, matching the original re-search.
+        pending = []
         for i, line in enumerate(lines):
-            line = line.strip()
-            if not line:
-                continue
-            
-            for marker, param_name in start_markers.items():
-                if marker.lower() in line.lower():
-                    # Look for the value in the same line or next few lines
-                    for j in range(i, min(i + 3, len(lines))):
-                        for pattern in value_patterns.get(param_name, [r'([\d\.]+)']):
-                            value_match = re.search(pattern, lines[j])
-                            if value_match and (j > i or marker.lower() not in lines[j].lower()):
-                                extracted_data[param_name] = value_match.group(1)
-                                break
-                        if param_name in extracted_data:
+            if pending:
+                still_pending = []
+                for param_name, patterns, last in pending:
+                    if param_name in extracted_data:
+                        continue
+                    for pattern in patterns:
+                        value_match = pattern.search(line)
+                        if value_match:
+                            extracted_data[param_name] = value_match.group(1)
                             break
-                    break
+                    else:
+                        if i < last:
+                            still_pending.append((param_name, patterns, last))
+                pending = still_pending
+            
+            marker_index = line_markers.get(i)
+            if marker_index is not None and lines_lower[i]:
+                param_name = marker_items[marker_index][1]
+                patterns = [_compile(pattern) for pattern in value_patterns.get(param_name, [r'([\d\.]+)'])]
+                pending.append((param_name, patterns, i + 2))
         
         return extracted_data
     
-    def _extract_table_rows(self, text):
+    def _extract_table_rows(self, text, expected=None):
         """
         Enhanced table extraction method for structured data.
         Detects and extracts data from table-like structures.
+        Stops scanning once every name in `expected` has been found; by default
+        these are the configured report field names.
+        `text` is kept for API compatibility; the parser's cached lines are reused
+        when it is the report text.
         """
-        extracted_data = {}
-        lines = text.split('\n')
+        if expected is None:
+            expected = {field['name'] for field in self.test_type_config.get('report_fields', [])}
         
-        # Look for table headers and data rows
-        table_patterns = [
-            # Pattern 1: Parameter | Result | Reference | Units | Status
-            r'([A-Za-z\s\(\)]+?)\s*\|\s*([\d\.\-\+]+)\s*\|\s*([\d\.\-\+\s\<\>]+)\s*\|\s*([A-Za-z/%]+)\s*\|\s*([A-Z]+)',
-            # Pattern 2: Parameter Result Reference Units Status (space separated)
-            r'([A-Za-z\s\(\)]+?)\s+([\d\.\-\+]+)\s+([\d\.\-\+\s\<\>]+)\s+([A-Za-z/%]+)\s+([A-Z]+)',
-            # Pattern 3: Simple Parameter: Value Unit pattern
-            r'([A-Za-z\s\(\)]+?)[:\.]\s*([\d\.\-\+]+)\s*([A-Za-z/%]*)',
-            # Pattern 4: TSH specific patterns for thyroid tests
-            r'(TSH|Free\s*T[34]|T[34][:T]*\s*Ratio|T[34]\s*Index)\s*[:\|\s]\s*([\d\.\-\+]+)\s*([A-Za-z/%]*)',
-            # Pattern 5: Lab values with units in parentheses  
-            r'([A-Za-z\s\(\)]+?)\s+([\d\.\-\+]+)\s*\(([A-Za-z/%]+)\)',
-        ]
+        extracted_data = {}
+        # Bind hot-loop lookups once instead of per line / per match
+        param_name_table = self._PARAM_NAME_TABLE
+        table_patterns = self._TABLE_ROW_PATTERNS
         
+        lines = self._lines if text is self.text else text.split('\n')
         for line in lines:
             line = line.strip()
-            if not line or len(line) < 5:
+            if len(line) < 5:
                 continue
-                
-            for pattern in table_patterns:
-                matches = re.finditer(pattern, line, re.IGNORECASE)
+            
+            for pattern, single in table_patterns:
+                if single:
+                    match = pattern.search(line)
+                    matches = (match,) if match else ()
+                else:
+                    matches = pattern.finditer(line)
                 for match in matches:
-                    groups = match.groups()
-                    if len(groups) >= 2:
-                        param_name = groups[0].strip()
-                        value = groups[1].strip()
-                        unit = groups[2].strip() if len(groups) > 2 else ''
-                        
-                        # Clean parameter name
-                        param_name = re.sub(r'[^\w\s\(\)]', '', param_name).strip()
-                        
-                        # Skip if parameter name is too short or generic
-                        if len(param_name) < 2 or param_name.lower() in ['test', 'result', 'reference', 'units', 'status']:
-                            continue
-                            
-                        # Combine value with unit if available
-                        if unit and unit not in value:
-                            full_value = f"{value} {unit}"
-                        else:
-                            full_value = value
-                            
-                        extracted_data[param_name] = full_value
-                        print(f" Found table field {param_name}: {full_value}", file=sys.stderr)
+                    # Every table pattern captures (parameter, value, unit, ...)
+                    param_name, value, unit = match.group(1, 2, 3)
+                    value = value.strip()
+                    unit = unit.strip()
+                    
+                    # Clean parameter name
+                    param_name = param_name.translate(param_name_table).strip()
+                    
+                    # Skip if parameter name is too short or generic
+                    if len(param_name) < 2 or param_name.lower() in self._GENERIC_TABLE_NAMES:
+                        continue
+                    
+                    # Combine value with unit if available
+                    if unit and unit not in value:
+                        full_value = f"{value} {unit}"
+                    else:
+                        full_value = value
+                    
+                    extracted_data[param_name] = full_value
+                    logger.debug(" Found table field %s: %s", param_name, full_value)
+                    
+                    if expected and expected.issubset(extracted_data):
+                        return extracted_data
         
         return extracted_data
     
@@ -245,7 +824,7 @@ class BaseParser(ABC):
             field_type = field_config.get('type', 'text')
             unit = field_config.get('unit', '')
             
-            # Generate multiple patterns for this field
+            # Generate multiple patterns for this field (compiled once per field configuration)
             patterns = self._generate_table_patterns(field_name, unit, field_type)
             
             # Try to extract the value
@@ -253,13 +832,17 @@ class BaseParser(ABC):
             
             if value:
                 extracted_data[field_name] = value
-                print(f" Found configured table field {field_name}: {value}", file=sys.stderr)
+                logger.debug(" Found configured table field %s: %s", field_name, value)
         
         return extracted_data
     
-    def _generate_table_patterns(self, field_name, unit='', field_type='text'):
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def _generate_table_patterns(field_name, unit='', field_type='text'):
         """
         Generate table-specific patterns for a field.
+        Patterns are compiled and cached per (field_name, unit, field_type), so the
+        escaping and compilation happen once per field rather than once per report.
         """
         # Escape special characters in field name
         escaped_name = re.escape(field_name).replace(r'\ ', r'\s*')
@@ -293,8 +876,9 @@ class BaseParser(ABC):
                 # PRIORITY 7: Scientific notation (single values only)
                 rf'{escaped_name}[^0-9]*?([\d\.\-\+]+\s*x?\s*10[\*\^]?[\d\-\+]+)(?!\s*-)',
                 
-                # FALLBACK: Any single number after field name (as last resort)
-                rf'{escaped_name}[^0-9]*?([\d\.\-\+]+)(?!\s*-)',
+                # FALLBACK: Any single number after field name on the same line (as last resort).
+                # Line-anchored with a bounded gap and no lookahead, so matching stays linear.
+                rf'(?m)^[^\n]*?{escaped_name}[^0-9\n]{{0,40}}([\d\.\-\+]+)(?:\s|$|[A-Za-z/%])',
             ])
         else:
             # Text patterns
@@ -303,4 +887,10 @@ class BaseParser(ABC):
                 rf'\|\s*{escaped_name}\s*\|\s*([^\|\n\r]+)\s*\|',
             ])
         
-        return patterns
+        return tuple(_compile_linear(pattern, re.IGNORECASE) for pattern in patterns)
+
+
+# Default basic fields compiled once at import
+BaseParser._DEFAULT_BASIC_FIELDS_COMPILED = BaseParser._compile_basic_fields(
+    BaseParser._get_default_basic_fields(None)
+)
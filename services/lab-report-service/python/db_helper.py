@@ -1,9 +1,45 @@
 #!/usr/bin/env python3
 import json
-import sys
+import collections
+import logging
 import subprocess
 import os
 import platform
+import time
+
+try:
+    # Optional: faster JSON decoding straight from the helper's raw output bytes
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger('medilink.lab')
+
+
+def _loads(data):
+    """
+    Decode JSON from str or UTF-8 bytes, with orjson when it is installed.
+    """
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def _config_ttl(default=300.0):
+    """
+    Seconds to cache configurations, from MEDILINK_CONFIG_TTL. A malformed value falls
+    back to the default with a warning instead of failing every import of this module.
+    """
+    value = os.environ.get('MEDILINK_CONFIG_TTL')
+    if not value:
+        return default
+    try:
+        ttl = float(value)
+    except ValueError:
+        ttl = -1.0
+    if not ttl >= 0:
+        logger.warning("Ignoring invalid MEDILINK_CONFIG_TTL=%r, using %g seconds", value, default)
+        return default
+    return ttl
+
 
 class DatabaseHelper:
     """
@@ -16,9 +52,32 @@ class DatabaseHelper:
         # Source directory
         self.src_path = os.path.join(self.service_root, 'src')
         # Path to the TypeScript helper script
-        self.script_path = os.path.join(self.src_path, 'utils', 'db_helper.ts')
+        self.script_path = self._prefer_compiled(os.path.join(self.src_path, 'utils', 'db_helper.ts'))
         # Determine ts-node executable candidates
         self.ts_node_candidates = self._build_ts_node_candidates()
+        # Limits concurrent async helper calls; created on first use inside the event loop
+        self._async_semaphore = None
+        # Loaded configurations with their expiry time, keyed by (lookup, argument); see invalidate()
+        self._cache = {}
+        # Seconds a loaded configuration is reused before the database is asked again
+        self._cache_ttl = _config_ttl()
+        # Runners and script probes never change for the life of the process
+        self._runner = self._runner_for(self.script_path)
+        self._script_exists = os.path.exists(self.script_path)
+
+    def _prefer_compiled(self, ts_path):
+        """
+        Use the prebuilt JavaScript (dist/<name>.js) of a TypeScript helper when it exists,
+        so it runs on plain node instead of paying ts-node startup.
+        """
+        name = os.path.splitext(os.path.basename(ts_path))[0]
+        js_path = os.path.join(self.service_root, 'dist', name + '.js')
+        return js_path if os.path.isfile(js_path) else ts_path
+
+    def _runner_for(self, script_path):
+        if script_path.endswith('.js'):
+            return ['node']
+        return self._resolve_ts_node() + self._ts_node_flags()
 
     def _build_ts_node_candidates(self):
         candidates = []
@@ -46,52 +105,130 @@ class DatabaseHelper:
                 return [cand]
         return ['ts-node']
 
+    def _ts_node_flags(self):
+        # Skip type checking outright; use the much faster swc transpiler when it is installed
+        flags = ['--transpile-only']
+        if os.path.isdir(os.path.join(self.service_root, 'node_modules', '@swc', 'core')):
+            flags.append('--swc')
+        return flags
+
+    def _helper_env(self):
+        env = os.environ.copy()
+        # Speed up ts-node & avoid typechecking overhead
+        env.setdefault('TS_NODE_TRANSPILE_ONLY', '1')
+        env.setdefault('TS_NODE_COMPILER_OPTIONS', '{"skipLibCheck":true,"isolatedModules":true}')
+        return env
+
     def _build_command(self, action, *args):
-        runner = self._resolve_ts_node()
-        cmd = runner + [self.script_path, action]
+        cmd = self._runner + [self.script_path, action]
         cmd.extend(map(str, args))
         return cmd
 
+    def _parse_helper_result(self, returncode, stdout, stderr):
+        """
+        Turn a finished helper process into (data, error). stderr is None when it was not captured.
+        """
+        if returncode != 0:
+            if stderr is None:
+                logger.error("TS helper error (rc=%d)", returncode)
+                return None, f"helper exited with rc={returncode}"
+            # Only the last lines matter, not the whole compilation banner
+            stderr_tail = '\n'.join(collections.deque(stderr.decode('utf-8', 'replace').splitlines(), maxlen=50)).strip()
+            logger.error("TS helper error (rc=%d) stderr: %s", returncode, stderr_tail)
+            return None, stderr_tail[:500]
+        if not stdout.strip():
+            return None, 'empty stdout from helper'
+        try:
+            data = _loads(stdout)
+            return data, None
+        except json.JSONDecodeError as e:
+            return None, f"json parse error: {e}: {stdout.strip()[:200].decode('utf-8', 'replace')}"
+
     def _run_helper(self, action, *args):
-        if not os.path.exists(self.script_path):
-            print(f"=== DATABASE HELPER NOT FOUND: {self.script_path} ===", file=sys.stderr)
+        if not self._script_exists:
+            logger.warning("Database helper not found: %s", self.script_path)
             return None, f"helper script missing: {self.script_path}"
         cmd = self._build_command(action, *args)
         # Debug logging
-        print(f"=== EXECUTING TS HELPER: {' '.join(cmd)} (cwd={self.service_root}) ===", file=sys.stderr)
-        env = os.environ.copy()
-        # Speed up ts-node & avoid typechecking overhead
-        env.setdefault('TS_NODE_TRANSPILE_ONLY', '1')
+        logger.debug("Executing TS helper: %s (cwd=%s)", ' '.join(cmd), self.service_root)
+        # ts-node's stderr is only worth buffering when it will be logged
+        debug = logger.isEnabledFor(logging.DEBUG)
         try:
             result = subprocess.run(
                 cmd,
-                capture_output=True,
-                text=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE if debug else subprocess.DEVNULL,
                 cwd=self.service_root,
-                env=env,
+                env=self._helper_env(),
                 timeout=15
             )
         except FileNotFoundError as e:
             return None, f"runner not found: {e}"
         except subprocess.TimeoutExpired:
             return None, 'timeout executing ts-node helper'
+        return self._parse_helper_result(result.returncode, result.stdout, result.stderr)
 
-        if result.returncode != 0:
-            stderr_snippet = result.stderr.strip()[:500]
-            print(f"=== TS HELPER ERROR (rc={result.returncode}) STDERR: {stderr_snippet} ===", file=sys.stderr)
-            return None, stderr_snippet
-        stdout = result.stdout.strip()
-        if not stdout:
-            return None, 'empty stdout from helper'
-        try:
-            data = json.loads(stdout)
-            return data, None
-        except json.JSONDecodeError as e:
-            return None, f"json parse error: {e}: {stdout[:200]}"
+    async def _run_helper_async(self, action, *args):
+        """
+        Async counterpart of _run_helper, so concurrent lookups overlap instead of
+        blocking on one helper process at a time. At most one helper process per
+        CPU runs at once.
+        """
+        # Imported here: only the async lookups need asyncio, and it is slow to import
+        import asyncio
+        
+        if not self._script_exists:
+            logger.warning("Database helper not found: %s", self.script_path)
+            return None, f"helper script missing: {self.script_path}"
+        cmd = self._build_command(action, *args)
+        logger.debug("Executing TS helper: %s (cwd=%s)", ' '.join(cmd), self.service_root)
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if self._async_semaphore is None:
+            self._async_semaphore = asyncio.Semaphore(os.cpu_count() or 1)
+        async with self._async_semaphore:
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE if debug else subprocess.DEVNULL,
+                    cwd=self.service_root,
+                    env=self._helper_env()
+                )
+            except FileNotFoundError as e:
+                return None, f"runner not found: {e}"
+            try:
+                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=15)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                return None, 'timeout executing ts-node helper'
+        return self._parse_helper_result(process.returncode, stdout, stderr)
+    
+    def invalidate(self):
+        """
+        Drop cached configurations so the next lookups query the database again.
+        """
+        self._cache.clear()
+    
+    def _cached(self, key):
+        """
+        Return the cached configuration for key, or None if absent or expired.
+        """
+        entry = self._cache.get(key)
+        if entry is not None and time.monotonic() < entry[1]:
+            return entry[0]
+        return None
+    
+    def _store(self, key, config):
+        self._cache[key] = (config, time.monotonic() + self._cache_ttl)
+        return config
     
     def get_test_type_config(self, test_type_id):
         """
         Get test type configuration from the database.
+        Database results are cached for MEDILINK_CONFIG_TTL seconds (default 300);
+        call invalidate() to refresh sooner.
+        The returned dictionary is shared between callers and must not be modified.
         
         Args:
             test_type_id: ID of the test type
@@ -99,20 +236,16 @@ class DatabaseHelper:
         Returns:
             Dictionary containing test type configuration
         """
-        try:
-            data, err = self._run_helper('getTestType', test_type_id)
-            if data is not None:
-                print(f"=== LOADED TEST TYPE CONFIG: {data.get('label', 'Unknown')} ===", file=sys.stderr)
-                return data
-            print(f"=== DATABASE HELPER ERROR: {err} ===", file=sys.stderr)
-            return self._get_config_by_id(test_type_id)
-        except Exception as e:
-            print(f"=== DATABASE HELPER UNHANDLED ERROR: {str(e)} ===", file=sys.stderr)
-            return self._get_config_by_id(test_type_id)
+        key = ('getTestType', test_type_id)
+        config = self._cached(key)
+        if config is None:
+            config = self._load_config(*key)
+        return config
     
     def get_test_type_by_format(self, file_format):
         """
         Get test type configuration by file format.
+        Cached like get_test_type_config.
         
         Args:
             file_format: Format identifier (fbc, lab_report, etc.)
@@ -120,60 +253,80 @@ class DatabaseHelper:
         Returns:
             Dictionary containing test type configuration
         """
+        key = ('getTestTypeByFormat', file_format)
+        config = self._cached(key)
+        if config is None:
+            config = self._load_config(*key)
+        return config
+    
+    async def get_test_type_config_async(self, test_type_id):
+        """
+        Async variant of get_test_type_config, sharing its cache.
+        """
+        return await self._lookup_async('getTestType', test_type_id)
+    
+    async def get_test_type_by_format_async(self, file_format):
+        """
+        Async variant of get_test_type_by_format, sharing its cache.
+        """
+        return await self._lookup_async('getTestTypeByFormat', file_format)
+    
+    async def _lookup_async(self, action, value):
+        key = (action, value)
+        config = self._cached(key)
+        if config is None:
+            try:
+                data, err = await self._run_helper_async(action, value)
+            except Exception as e:
+                logger.error("Database helper unhandled error: %s", e)
+                data, err = None, str(e)
+            config = self._config_from_reply(action, value, data, err)
+        return config
+    
+    def _load_config(self, action, value):
         try:
-            data, err = self._run_helper('getTestTypeByFormat', file_format)
-            if data is not None:
-                print(f"=== LOADED CONFIG FOR FORMAT {file_format}: {data.get('label', 'Unknown')} ===", file=sys.stderr)
-                return data
-            print(f"=== DATABASE HELPER ERROR: {err} ===", file=sys.stderr)
-            return self._get_default_config_by_format(file_format)
+            data, err = self._run_helper(action, value)
         except Exception as e:
-            print(f"=== DATABASE HELPER UNHANDLED ERROR: {str(e)} ===", file=sys.stderr)
-            return self._get_default_config_by_format(file_format)
+            logger.error("Database helper unhandled error: %s", e)
+            data, err = None, str(e)
+        return self._config_from_reply(action, value, data, err)
+    
+    def _config_from_reply(self, action, value, data, err):
+        """
+        Cache and use the helper's configuration, or the hardcoded fallback when it
+        returned none. The fallback is not cached, so a transient helper failure does
+        not pin it until the TTL expires.
+        """
+        if data is not None:
+            logger.debug("Loaded config for %s %s: %s", action, value, data.get('label', 'Unknown'))
+            return self._store((action, value), data)
+        logger.warning("Database helper error: %s", err)
+        if action == 'getTestType':
+            return self._get_config_by_id(value)
+        return self._get_default_config_by_format(value)
     
     def _get_default_config(self):
         """
         Get default configuration when database is not available.
         """
-        return {
-            'id': 0,
-            'value': 'generic',
-            'label': 'Generic Report',
-            'category': 'general',
-            'parser_module': None,
-            'parser_class': None,
-            'report_fields': [],
-            'reference_ranges': {},
-            'basic_fields': []
-        }
+        return _DEFAULT_CONFIG
     
     def _get_config_by_id(self, test_type_id):
         """
         Get configuration by test type ID with dynamic fallback.
         This method provides fallback configs while the system transitions to full database integration.
         """
-        print(f"=== FALLBACK CONFIG FOR TEST TYPE ID: {test_type_id} ===", file=sys.stderr)
+        logger.debug("Fallback config for test type ID: %s", test_type_id)
         
-        # Dynamic test type configurations - these should eventually come from database
-        dynamic_configs = {
-            1: self._build_config(1, 'fbc', 'Full Blood Count', 'hematology', 'parser_fbc_report', 'FBCReportParser'),
-            2: self._build_config(2, 'lab_report', 'General Lab Report', 'general', 'parser_lab_report', 'LabReportParser'),
-            3: self._build_config(3, 'prescription', 'Prescription', 'prescription', 'parser_prescription', 'PrescriptionParser'),
-            4: self._build_config(4, 'fbc_enhanced', 'Enhanced Full Blood Count', 'hematology', 'parser_fbc_report', 'FBCReportParser'),
-            5: self._build_config(5, 'lipid_panel', 'Lipid Panel', 'biochemistry', 'parser_lab_report', 'LabReportParser'),
-            6: self._build_config(6, 'thyroid_function', 'Thyroid Function Test', 'endocrinology', 'parser_lab_report', 'LabReportParser'),
-            7: self._build_config(7, 'patient_details', 'Patient Details', 'patient', 'parser_patient_details', 'PatientDetailsParser'),
-            8: self._build_config(8, 'liver_function', 'Liver Function Test', 'biochemistry', 'parser_lab_report', 'LabReportParser'),
-        }
-        
-        if test_type_id in dynamic_configs:
-            return dynamic_configs[test_type_id]
-        else:
-            # For unknown test types, try intelligent mapping
-            print(f"=== UNKNOWN TEST TYPE ID {test_type_id} - USING INTELLIGENT FALLBACK ===", file=sys.stderr)
-            return self._create_dynamic_config(test_type_id)
+        config = self._DYNAMIC_CONFIGS.get(test_type_id)
+        if config is not None:
+            return config
+        # For unknown test types, try intelligent mapping
+        logger.debug("Unknown test type ID %s - using intelligent fallback", test_type_id)
+        return self._create_dynamic_config(test_type_id)
     
-    def _build_config(self, id, value, label, category, parser_module, parser_class):
+    @staticmethod
+    def _build_config(id, value, label, category, parser_module, parser_class):
         """
         Build a configuration object dynamically.
         """
@@ -189,14 +342,9 @@ class DatabaseHelper:
         }
         
         # Add specific field configurations based on test type
-        if value == 'thyroid_function':
-            config.update(self._get_thyroid_config())
-        elif value == 'fbc' or value == 'fbc_enhanced':
-            config.update(self._get_fbc_config())
-        elif value == 'lipid_panel':
-            config.update(self._get_lipid_config())
-        elif value == 'liver_function':
-            config.update(self._get_liver_config())
+        extra = _VALUE_TO_EXTRA.get(value)
+        if extra is not None:
+            config.update(extra)
         
         return config
     
@@ -231,203 +379,232 @@ class DatabaseHelper:
         """
         Generic field set for unknown test types.
         """
-        return [
-            {'name': 'Result', 'type': 'text', 'required': False, 'unit': '', 'normalRange': ''},
-            {'name': 'Value', 'type': 'decimal', 'required': False, 'unit': '', 'normalRange': ''},
-            {'name': 'Status', 'type': 'text', 'required': False, 'unit': '', 'normalRange': ''},
-        ]
+        return _GENERIC_FIELDS
     
     def _get_default_config_by_format(self, file_format):
         """
         Get default configuration based on file format.
         """
-        format_configs = {
-            'fbc': {
-                'id': 1,
-                'value': 'fbc',
-                'label': 'Full Blood Count',
-                'category': 'hematology',
-                'parser_module': 'parser_fbc_report',
-                'parser_class': 'FBCReportParser',
-                'report_fields': [
-                    {'name': 'RBC', 'type': 'number', 'required': True, 'unit': 'x 10^12/L', 'normalRange': '4.5-5.5'},
-                    {'name': 'Hemoglobin', 'type': 'number', 'required': True, 'unit': 'g/dL', 'normalRange': '13.5-17.5'},
-                    {'name': 'Hematocrit', 'type': 'number', 'required': True, 'unit': '%', 'normalRange': '41-53'},
-                    {'name': 'WBC', 'type': 'number', 'required': True, 'unit': 'x 10^9/L', 'normalRange': '4.0-11.0'},
-                    {'name': 'Platelets', 'type': 'number', 'required': True, 'unit': 'x 10^9/L', 'normalRange': '150-450'},
-                ],
-                'reference_ranges': {
-                    'RBC': {'min': 4.5, 'max': 5.5, 'unit': 'x 10^12/L', 'normalRange': '4.5-5.5'},
-                    'Hemoglobin': {'min': 13.5, 'max': 17.5, 'unit': 'g/dL', 'normalRange': '13.5-17.5'},
-                    'Hematocrit': {'min': 41, 'max': 53, 'unit': '%', 'normalRange': '41-53'},
-                    'WBC': {'min': 4.0, 'max': 11.0, 'unit': 'x 10^9/L', 'normalRange': '4.0-11.0'},
-                    'Platelets': {'min': 150, 'max': 450, 'unit': 'x 10^9/L', 'normalRange': '150-450'},
-                }
-            },
-            'lab_report': {
-                'id': 2,
-                'value': 'lab_report',
-                'label': 'General Lab Report',
-                'category': 'general',
-                'parser_module': 'parser_lab_report',
-                'parser_class': 'LabReportParser',
-                'report_fields': [
-                    {'name': 'Glucose', 'type': 'number', 'required': True, 'unit': 'mg/dL', 'normalRange': '70-100'},
-                    {'name': 'Cholesterol', 'type': 'number', 'required': False, 'unit': 'mg/dL', 'normalRange': '<200'},
-                    {'name': 'Creatinine', 'type': 'number', 'required': False, 'unit': 'mg/dL', 'normalRange': '0.6-1.2'},
-                ],
-                'reference_ranges': {
-                    'Glucose': {'min': 70, 'max': 100, 'unit': 'mg/dL', 'normalRange': '70-100'},
-                    'Cholesterol': {'max': 200, 'unit': 'mg/dL', 'normalRange': '<200'},
-                    'Creatinine': {'min': 0.6, 'max': 1.2, 'unit': 'mg/dL', 'normalRange': '0.6-1.2'},
-                }
-            },
-            'prescription': {
-                'id': 3,
-                'value': 'prescription',
-                'label': 'Prescription',
-                'category': 'prescription',
-                'parser_module': 'parser_prescription',
-                'parser_class': 'PrescriptionParser',
-                'report_fields': [],
-                'reference_ranges': {}
-            },
-            'patient_details': {
-                'id': 4,
-                'value': 'patient_details',
-                'label': 'Patient Details',
-                'category': 'patient',
-                'parser_module': 'parser_patient_details',
-                'parser_class': 'PatientDetailsParser',
-                'report_fields': [],
-                'reference_ranges': {}
-            },
-            'thyroid_function': {
-                'id': 6,
-                'value': 'thyroid_function',
-                'label': 'Thyroid Function Test',
-                'category': 'endocrinology',
-                'parser_module': 'parser_lab_report',
-                'parser_class': 'LabReportParser',
-                'report_fields': [
-                    {'name': 'TSH', 'type': 'decimal', 'required': True, 'unit': 'mIU/L', 'normalRange': '0.4-4.0'},
-                    {'name': 'Free T4', 'type': 'decimal', 'required': True, 'unit': 'ng/dL', 'normalRange': '0.8-1.8'},
-                    {'name': 'Free T3', 'type': 'decimal', 'required': False, 'unit': 'pg/mL', 'normalRange': '2.3-4.2'},
-                    {'name': 'T4:T3 Ratio', 'type': 'decimal', 'required': False, 'unit': 'ratio', 'normalRange': '2.5-5.0'},
-                    {'name': 'Free T4 Index', 'type': 'decimal', 'required': False, 'unit': 'index', 'normalRange': '4.5-10.5'}
-                ],
-                'reference_ranges': {
-                    'TSH': {'min': 0.4, 'max': 4.0, 'unit': 'mIU/L', 'normalRange': '0.4-4.0'},
-                    'Free T4': {'min': 0.8, 'max': 1.8, 'unit': 'ng/dL', 'normalRange': '0.8-1.8'},
-                    'Free T3': {'min': 2.3, 'max': 4.2, 'unit': 'pg/mL', 'normalRange': '2.3-4.2'},
-                    'T4:T3 Ratio': {'min': 2.5, 'max': 5.0, 'unit': 'ratio', 'normalRange': '2.5-5.0'},
-                    'Free T4 Index': {'min': 4.5, 'max': 10.5, 'unit': 'index', 'normalRange': '4.5-10.5'}
-                }
-            },
-            'lipid_panel': {
-                'id': 7,
-                'value': 'lipid_panel',
-                'label': 'Lipid Panel',
-                'category': 'biochemistry',
-                'parser_module': 'parser_lab_report',
-                'parser_class': 'LabReportParser',
-                'report_fields': [
-                    {'name': 'Total Cholesterol', 'type': 'number', 'required': True, 'unit': 'mg/dL', 'normalRange': '<200'},
-                    {'name': 'HDL Cholesterol', 'type': 'number', 'required': True, 'unit': 'mg/dL', 'normalRange': '>40'},
-                    {'name': 'LDL Cholesterol', 'type': 'number', 'required': True, 'unit': 'mg/dL', 'normalRange': '<100'},
-                    {'name': 'Triglycerides', 'type': 'number', 'required': True, 'unit': 'mg/dL', 'normalRange': '<150'}
-                ],
-                'reference_ranges': {
-                    'Total Cholesterol': {'max': 200, 'unit': 'mg/dL', 'normalRange': '<200'},
-                    'HDL Cholesterol': {'min': 40, 'unit': 'mg/dL', 'normalRange': '>40'},
-                    'LDL Cholesterol': {'max': 100, 'unit': 'mg/dL', 'normalRange': '<100'},
-                    'Triglycerides': {'max': 150, 'unit': 'mg/dL', 'normalRange': '<150'}
-                }
-            }
-        }
-        
-        return format_configs.get(file_format, self._get_default_config())
-    
-    def _get_thyroid_config(self):
-        """
-        Get thyroid-specific field configuration.
-        """
-        return {
-            'report_fields': [
-                {'name': 'TSH', 'type': 'decimal', 'required': True, 'unit': 'mIU/L', 'normalRange': '0.4-4.0'},
-                {'name': 'Free T4', 'type': 'decimal', 'required': True, 'unit': 'ng/dL', 'normalRange': '0.8-1.8'},
-                {'name': 'Free T3', 'type': 'decimal', 'required': False, 'unit': 'pg/mL', 'normalRange': '2.3-4.2'},
-                {'name': 'T4:T3 Ratio', 'type': 'decimal', 'required': False, 'unit': 'ratio', 'normalRange': '2.5-5.0'},
-                {'name': 'Free T4 Index', 'type': 'decimal', 'required': False, 'unit': 'index', 'normalRange': '4.5-10.5'}
-            ],
-            'reference_ranges': {
-                'TSH': {'min': 0.4, 'max': 4.0, 'unit': 'mIU/L', 'normalRange': '0.4-4.0'},
-                'Free T4': {'min': 0.8, 'max': 1.8, 'unit': 'ng/dL', 'normalRange': '0.8-1.8'},
-                'Free T3': {'min': 2.3, 'max': 4.2, 'unit': 'pg/mL', 'normalRange': '2.3-4.2'},
-                'T4:T3 Ratio': {'min': 2.5, 'max': 5.0, 'unit': 'ratio', 'normalRange': '2.5-5.0'},
-                'Free T4 Index': {'min': 4.5, 'max': 10.5, 'unit': 'index', 'normalRange': '4.5-10.5'}
-            }
+        return _FORMAT_CONFIGS.get(file_format, _DEFAULT_CONFIG)
+
+
+# Fallback configuration tables, built once at import.
+# Configurations are shared between callers and must be treated as read-only.
+
+# Configuration used when the database is not available
+_DEFAULT_CONFIG = {
+    'id': 0,
+    'value': 'generic',
+    'label': 'Generic Report',
+    'category': 'general',
+    'parser_module': None,
+    'parser_class': None,
+    'report_fields': [],
+    'reference_ranges': {},
+    'basic_fields': []
+}
+
+# Generic field set for unknown test types
+_GENERIC_FIELDS = [
+    {'name': 'Result', 'type': 'text', 'required': False, 'unit': '', 'normalRange': ''},
+    {'name': 'Value', 'type': 'decimal', 'required': False, 'unit': '', 'normalRange': ''},
+    {'name': 'Status', 'type': 'text', 'required': False, 'unit': '', 'normalRange': ''},
+]
+
+# Default configurations by file format
+_FORMAT_CONFIGS = {
+    'fbc': {
+        'id': 1,
+        'value': 'fbc',
+        'label': 'Full Blood Count',
+        'category': 'hematology',
+        'parser_module': 'parser_fbc_report',
+        'parser_class': 'FBCReportParser',
+        'report_fields': [
+            {'name': 'RBC', 'type': 'number', 'required': True, 'unit': 'x 10^12/L', 'normalRange': '4.5-5.5'},
+            {'name': 'Hemoglobin', 'type': 'number', 'required': True, 'unit': 'g/dL', 'normalRange': '13.5-17.5'},
+            {'name': 'Hematocrit', 'type': 'number', 'required': True, 'unit': '%', 'normalRange': '41-53'},
+            {'name': 'WBC', 'type': 'number', 'required': True, 'unit': 'x 10^9/L', 'normalRange': '4.0-11.0'},
+            {'name': 'Platelets', 'type': 'number', 'required': True, 'unit': 'x 10^9/L', 'normalRange': '150-450'},
+        ],
+        'reference_ranges': {
+            'RBC': {'min': 4.5, 'max': 5.5, 'unit': 'x 10^12/L', 'normalRange': '4.5-5.5'},
+            'Hemoglobin': {'min': 13.5, 'max': 17.5, 'unit': 'g/dL', 'normalRange': '13.5-17.5'},
+            'Hematocrit': {'min': 41, 'max': 53, 'unit': '%', 'normalRange': '41-53'},
+            'WBC': {'min': 4.0, 'max': 11.0, 'unit': 'x 10^9/L', 'normalRange': '4.0-11.0'},
+            'Platelets': {'min': 150, 'max': 450, 'unit': 'x 10^9/L', 'normalRange': '150-450'},
         }
-    
-    def _get_fbc_config(self):
-        """
-        Get FBC-specific field configuration.
-        """
-        return {
-            'report_fields': [
-                {'name': 'RBC', 'type': 'decimal', 'required': True, 'unit': 'x 10^12/L', 'normalRange': '4.5-5.5'},
-                {'name': 'Hemoglobin', 'type': 'decimal', 'required': True, 'unit': 'g/dL', 'normalRange': '13.5-17.5'},
-                {'name': 'Hematocrit', 'type': 'decimal', 'required': True, 'unit': '%', 'normalRange': '41-53'},
-                {'name': 'WBC', 'type': 'decimal', 'required': True, 'unit': 'x 10^9/L', 'normalRange': '4.0-11.0'},
-                {'name': 'Platelets', 'type': 'decimal', 'required': True, 'unit': 'x 10^9/L', 'normalRange': '150-450'},
-            ],
-            'reference_ranges': {
-                'RBC': {'min': 4.5, 'max': 5.5, 'unit': 'x 10^12/L', 'normalRange': '4.5-5.5'},
-                'Hemoglobin': {'min': 13.5, 'max': 17.5, 'unit': 'g/dL', 'normalRange': '13.5-17.5'},
-                'Hematocrit': {'min': 41, 'max': 53, 'unit': '%', 'normalRange': '41-53'},
-                'WBC': {'min': 4.0, 'max': 11.0, 'unit': 'x 10^9/L', 'normalRange': '4.0-11.0'},
-                'Platelets': {'min': 150, 'max': 450, 'unit': 'x 10^9/L', 'normalRange': '150-450'},
-            }
+    },
+    'lab_report': {
+        'id': 2,
+        'value': 'lab_report',
+        'label': 'General Lab Report',
+        'category': 'general',
+        'parser_module': 'parser_lab_report',
+        'parser_class': 'LabReportParser',
+        'report_fields': [
+            {'name': 'Glucose', 'type': 'number', 'required': True, 'unit': 'mg/dL', 'normalRange': '70-100'},
+            {'name': 'Cholesterol', 'type': 'number', 'required': False, 'unit': 'mg/dL', 'normalRange': '<200'},
+            {'name': 'Creatinine', 'type': 'number', 'required': False, 'unit': 'mg/dL', 'normalRange': '0.6-1.2'},
+        ],
+        'reference_ranges': {
+            'Glucose': {'min': 70, 'max': 100, 'unit': 'mg/dL', 'normalRange': '70-100'},
+            'Cholesterol': {'max': 200, 'unit': 'mg/dL', 'normalRange': '<200'},
+            'Creatinine': {'min': 0.6, 'max': 1.2, 'unit': 'mg/dL', 'normalRange': '0.6-1.2'},
         }
-    
-    def _get_lipid_config(self):
-        """
-        Get lipid panel field configuration.
-        """
-        return {
-            'report_fields': [
-                {'name': 'Total Cholesterol', 'type': 'decimal', 'required': True, 'unit': 'mg/dL', 'normalRange': '<200'},
-                {'name': 'HDL Cholesterol', 'type': 'decimal', 'required': True, 'unit': 'mg/dL', 'normalRange': '>40'},
-                {'name': 'LDL Cholesterol', 'type': 'decimal', 'required': True, 'unit': 'mg/dL', 'normalRange': '<100'},
-                {'name': 'Triglycerides', 'type': 'decimal', 'required': True, 'unit': 'mg/dL', 'normalRange': '<150'}
-            ],
-            'reference_ranges': {
-                'Total Cholesterol': {'max': 200, 'unit': 'mg/dL', 'normalRange': '<200'},
-                'HDL Cholesterol': {'min': 40, 'unit': 'mg/dL', 'normalRange': '>40'},
-                'LDL Cholesterol': {'max': 100, 'unit': 'mg/dL', 'normalRange': '<100'},
-                'Triglycerides': {'max': 150, 'unit': 'mg/dL', 'normalRange': '<150'}
-            }
+    },
+    'prescription': {
+        'id': 3,
+        'value': 'prescription',
+        'label': 'Prescription',
+        'category': 'prescription',
+        'parser_module': 'parser_prescription',
+        'parser_class': 'PrescriptionParser',
+        'report_fields': [],
+        'reference_ranges': {}
+    },
+    'patient_details': {
+        'id': 4,
+        'value': 'patient_details',
+        'label': 'Patient Details',
+        'category': 'patient',
+        'parser_module': 'parser_patient_details',
+        'parser_class': 'PatientDetailsParser',
+        'report_fields': [],
+        'reference_ranges': {}
+    },
+    'thyroid_function': {
+        'id': 6,
+        'value': 'thyroid_function',
+        'label': 'Thyroid Function Test',
+        'category': 'endocrinology',
+        'parser_module': 'parser_lab_report',
+        'parser_class': 'LabReportParser',
+        'report_fields': [
+            {'name': 'TSH', 'type': 'decimal', 'required': True, 'unit': 'mIU/L', 'normalRange': '0.4-4.0'},
+            {'name': 'Free T4', 'type': 'decimal', 'required': True, 'unit': 'ng/dL', 'normalRange': '0.8-1.8'},
+            {'name': 'Free T3', 'type': 'decimal', 'required': False, 'unit': 'pg/mL', 'normalRange': '2.3-4.2'},
+            {'name': 'T4:T3 Ratio', 'type': 'decimal', 'required': False, 'unit': 'ratio', 'normalRange': '2.5-5.0'},
+            {'name': 'Free T4 Index', 'type': 'decimal', 'required': False, 'unit': 'index', 'normalRange': '4.5-10.5'}
+        ],
+        'reference_ranges': {
+            'TSH': {'min': 0.4, 'max': 4.0, 'unit': 'mIU/L', 'normalRange': '0.4-4.0'},
+            'Free T4': {'min': 0.8, 'max': 1.8, 'unit': 'ng/dL', 'normalRange': '0.8-1.8'},
+            'Free T3': {'min': 2.3, 'max': 4.2, 'unit': 'pg/mL', 'normalRange': '2.3-4.2'},
+            'T4:T3 Ratio': {'min': 2.5, 'max': 5.0, 'unit': 'ratio', 'normalRange': '2.5-5.0'},
+            'Free T4 Index': {'min': 4.5, 'max': 10.5, 'unit': 'index', 'normalRange': '4.5-10.5'}
         }
-    
-    def _get_liver_config(self):
-        """
-        Get liver function test configuration.
-        """
-        return {
-            'report_fields': [
-                {'name': 'ALT', 'type': 'decimal', 'required': True, 'unit': 'U/L', 'normalRange': '7-45'},
-                {'name': 'AST', 'type': 'decimal', 'required': True, 'unit': 'U/L', 'normalRange': '8-40'},
-                {'name': 'Bilirubin', 'type': 'decimal', 'required': True, 'unit': 'mg/dL', 'normalRange': '0.2-1.2'},
-                {'name': 'Alkaline Phosphatase', 'type': 'decimal', 'required': False, 'unit': 'U/L', 'normalRange': '44-147'}
-            ],
-            'reference_ranges': {
-                'ALT': {'min': 7, 'max': 45, 'unit': 'U/L', 'normalRange': '7-45'},
-                'AST': {'min': 8, 'max': 40, 'unit': 'U/L', 'normalRange': '8-40'},
-                'Bilirubin': {'min': 0.2, 'max': 1.2, 'unit': 'mg/dL', 'normalRange': '0.2-1.2'},
-                'Alkaline Phosphatase': {'min': 44, 'max': 147, 'unit': 'U/L', 'normalRange': '44-147'}
-            }
+    },
+    'lipid_panel': {
+        'id': 7,
+        'value': 'lipid_panel',
+        'label': 'Lipid Panel',
+        'category': 'biochemistry',
+        'parser_module': 'parser_lab_report',
+        'parser_class': 'LabReportParser',
+        'report_fields': [
+            {'name': 'Total Cholesterol', 'type': 'number', 'required': True, 'unit': 'mg/dL', 'normalRange': '<200'},
+            {'name': 'HDL Cholesterol', 'type': 'number', 'required': True, 'unit': 'mg/dL', 'normalRange': '>40'},
+            {'name': 'LDL Cholesterol', 'type': 'number', 'required': True, 'unit': 'mg/dL', 'normalRange': '<100'},
+            {'name': 'Triglycerides', 'type': 'number', 'required': True, 'unit': 'mg/dL', 'normalRange': '<150'}
+        ],
+        'reference_ranges': {
+            'Total Cholesterol': {'max': 200, 'unit': 'mg/dL', 'normalRange': '<200'},
+            'HDL Cholesterol': {'min': 40, 'unit': 'mg/dL', 'normalRange': '>40'},
+            'LDL Cholesterol': {'max': 100, 'unit': 'mg/dL', 'normalRange': '<100'},
+            'Triglycerides': {'max': 150, 'unit': 'mg/dL', 'normalRange': '<150'}
         }
+    }
+}
+
+# Thyroid-specific field configuration
+_THYROID_EXTRA = {
+    'report_fields': [
+        {'name': 'TSH', 'type': 'decimal', 'required': True, 'unit': 'mIU/L', 'normalRange': '0.4-4.0'},
+        {'name': 'Free T4', 'type': 'decimal', 'required': True, 'unit': 'ng/dL', 'normalRange': '0.8-1.8'},
+        {'name': 'Free T3', 'type': 'decimal', 'required': False, 'unit': 'pg/mL', 'normalRange': '2.3-4.2'},
+        {'name': 'T4:T3 Ratio', 'type': 'decimal', 'required': False, 'unit': 'ratio', 'normalRange': '2.5-5.0'},
+        {'name': 'Free T4 Index', 'type': 'decimal', 'required': False, 'unit': 'index', 'normalRange': '4.5-10.5'}
+    ],
+    'reference_ranges': {
+        'TSH': {'min': 0.4, 'max': 4.0, 'unit': 'mIU/L', 'normalRange': '0.4-4.0'},
+        'Free T4': {'min': 0.8, 'max': 1.8, 'unit': 'ng/dL', 'normalRange': '0.8-1.8'},
+        'Free T3': {'min': 2.3, 'max': 4.2, 'unit': 'pg/mL', 'normalRange': '2.3-4.2'},
+        'T4:T3 Ratio': {'min': 2.5, 'max': 5.0, 'unit': 'ratio', 'normalRange': '2.5-5.0'},
+        'Free T4 Index': {'min': 4.5, 'max': 10.5, 'unit': 'index', 'normalRange': '4.5-10.5'}
+    }
+}
+
+# FBC-specific field configuration
+_FBC_EXTRA = {
+    'report_fields': [
+        {'name': 'RBC', 'type': 'decimal', 'required': True, 'unit': 'x 10^12/L', 'normalRange': '4.5-5.5'},
+        {'name': 'Hemoglobin', 'type': 'decimal', 'required': True, 'unit': 'g/dL', 'normalRange': '13.5-17.5'},
+        {'name': 'Hematocrit', 'type': 'decimal', 'required': True, 'unit': '%', 'normalRange': '41-53'},
+        {'name': 'WBC', 'type': 'decimal', 'required': True, 'unit': 'x 10^9/L', 'normalRange': '4.0-11.0'},
+        {'name': 'Platelets', 'type': 'decimal', 'required': True, 'unit': 'x 10^9/L', 'normalRange': '150-450'},
+    ],
+    'reference_ranges': {
+        'RBC': {'min': 4.5, 'max': 5.5, 'unit': 'x 10^12/L', 'normalRange': '4.5-5.5'},
+        'Hemoglobin': {'min': 13.5, 'max': 17.5, 'unit': 'g/dL', 'normalRange': '13.5-17.5'},
+        'Hematocrit': {'min': 41, 'max': 53, 'unit': '%', 'normalRange': '41-53'},
+        'WBC': {'min': 4.0, 'max': 11.0, 'unit': 'x 10^9/L', 'normalRange': '4.0-11.0'},
+        'Platelets': {'min': 150, 'max': 450, 'unit': 'x 10^9/L', 'normalRange': '150-450'},
+    }
+}
+
+# Lipid panel field configuration
+_LIPID_EXTRA = {
+    'report_fields': [
+        {'name': 'Total Cholesterol', 'type': 'decimal', 'required': True, 'unit': 'mg/dL', 'normalRange': '<200'},
+        {'name': 'HDL Cholesterol', 'type': 'decimal', 'required': True, 'unit': 'mg/dL', 'normalRange': '>40'},
+        {'name': 'LDL Cholesterol', 'type': 'decimal', 'required': True, 'unit': 'mg/dL', 'normalRange': '<100'},
+        {'name': 'Triglycerides', 'type': 'decimal', 'required': True, 'unit': 'mg/dL', 'normalRange': '<150'}
+    ],
+    'reference_ranges': {
+        'Total Cholesterol': {'max': 200, 'unit': 'mg/dL', 'normalRange': '<200'},
+        'HDL Cholesterol': {'min': 40, 'unit': 'mg/dL', 'normalRange': '>40'},
+        'LDL Cholesterol': {'max': 100, 'unit': 'mg/dL', 'normalRange': '<100'},
+        'Triglycerides': {'max': 150, 'unit': 'mg/dL', 'normalRange': '<150'}
+    }
+}
+
+# Liver function test configuration
+_LIVER_EXTRA = {
+    'report_fields': [
+        {'name': 'ALT', 'type': 'decimal', 'required': True, 'unit': 'U/L', 'normalRange': '7-45'},
+        {'name': 'AST', 'type': 'decimal', 'required': True, 'unit': 'U/L', 'normalRange': '8-40'},
+        {'name': 'Bilirubin', 'type': 'decimal', 'required': True, 'unit': 'mg/dL', 'normalRange': '0.2-1.2'},
+        {'name': 'Alkaline Phosphatase', 'type': 'decimal', 'required': False, 'unit': 'U/L', 'normalRange': '44-147'}
+    ],
+    'reference_ranges': {
+        'ALT': {'min': 7, 'max': 45, 'unit': 'U/L', 'normalRange': '7-45'},
+        'AST': {'min': 8, 'max': 40, 'unit': 'U/L', 'normalRange': '8-40'},
+        'Bilirubin': {'min': 0.2, 'max': 1.2, 'unit': 'mg/dL', 'normalRange': '0.2-1.2'},
+        'Alkaline Phosphatase': {'min': 44, 'max': 147, 'unit': 'U/L', 'normalRange': '44-147'}
+    }
+}
+
+# Extra field configuration merged into built configs, by test type value
+_VALUE_TO_EXTRA = {
+    'thyroid_function': _THYROID_EXTRA,
+    'fbc': _FBC_EXTRA,
+    'fbc_enhanced': _FBC_EXTRA,
+    'lipid_panel': _LIPID_EXTRA,
+    'liver_function': _LIVER_EXTRA,
+}
 
+# Dynamic test type configurations by ID - these should eventually come from database
+DatabaseHelper._DYNAMIC_CONFIGS = {
+    1: DatabaseHelper._build_config(1, 'fbc', 'Full Blood Count', 'hematology', 'parser_fbc_report', 'FBCReportParser'),
+    2: DatabaseHelper._build_config(2, 'lab_report', 'General Lab Report', 'general', 'parser_lab_report', 'LabReportParser'),
+    3: DatabaseHelper._build_config(3, 'prescription', 'Prescription', 'prescription', 'parser_prescription', 'PrescriptionParser'),
+    4: DatabaseHelper._build_config(4, 'fbc_enhanced', 'Enhanced Full Blood Count', 'hematology', 'parser_fbc_report', 'FBCReportParser'),
+    5: DatabaseHelper._build_config(5, 'lipid_panel', 'Lipid Panel', 'biochemistry', 'parser_lab_report', 'LabReportParser'),
+    6: DatabaseHelper._build_config(6, 'thyroid_function', 'Thyroid Function Test', 'endocrinology', 'parser_lab_report', 'LabReportParser'),
+    7: DatabaseHelper._build_config(7, 'patient_details', 'Patient Details', 'patient', 'parser_patient_details', 'PatientDetailsParser'),
+    8: DatabaseHelper._build_config(8, 'liver_function', 'Liver Function Test', 'biochemistry', 'parser_lab_report', 'LabReportParser'),
+}
 
 # Global database helper instance
 db_helper = DatabaseHelper()
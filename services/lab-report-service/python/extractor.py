@@ -1,12 +1,35 @@
 #!/usr/bin/env python3
 import sys
 import json
+import stat
+import time
+import hashlib
+import logging
+import tempfile
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pdf2image import convert_from_path
+from PIL import Image
 import pytesseract
 import utils
 from db_helper import db_helper
 from parser_factory import parser_factory
 
+try:
+    # Optional: libtesseract in-process, without pytesseract's temp file and CLI call per page
+    from tesserocr import PyTessBaseAPI, PSM
+except ImportError:
+    PyTessBaseAPI = None
+
+try:
+    # Optional: PyMuPDF renders pages in-process, without a poppler subprocess per call
+    import fitz
+except ImportError:
+    fitz = None
+
+logger = logging.getLogger('medilink.lab')
+
 # Use environment variables in Docker, fallback to hardcoded paths for local development
 import os
 POPPLER_PATH = os.getenv('POPPLER_PATH', r"C:/poppler-24.08.0/Library/bin")
@@ -18,66 +41,348 @@ if os.getenv('NODE_ENV') == 'production':
 else:
     pytesseract.pytesseract.tesseract_cmd = TESSERACT_ENGINE_PATH
 
+def _env_int(name, default, minimum=None):
+    value = os.getenv(name)
+    try:
+        number = int(value) if value else default
+    except ValueError:
+        number = None
+    if number is None or (minimum is not None and number < minimum):
+        logger.warning("Ignoring invalid %s=%r, using %d", name, value, default)
+        return default
+    return number
+
+# Opt-in cache of OCR page texts of already-processed PDFs; unset disables it.
+# Must be a directory owned by this user with mode 0700 (created if missing)
+OCR_CACHE_DIR = os.getenv('OCR_CACHE_DIR')
+
+# Per-process tesserocr API, created on first use and reused for every page
+_tess_api = None
+_tess_api_failed = False
+
+def _get_tess_api():
+    global _tess_api, _tess_api_failed
+    if _tess_api is None and PyTessBaseAPI is not None and not _tess_api_failed:
+        try:
+            _tess_api = PyTessBaseAPI(psm=PSM.AUTO, lang='eng')
+        except RuntimeError as e:
+            # e.g. tessdata not found; stay on the pytesseract CLI path
+            logger.warning("tesserocr unavailable, using pytesseract: %s", e)
+            _tess_api_failed = True
+    return _tess_api
+
+def _ocr_image(image):
+    processed_image = utils.preprocess_image(image)
+    api = _get_tess_api()
+    if api is not None:
+        # Hand Tesseract the raw 8-bit pixels instead of letting tesserocr re-encode
+        # the image; 1-bit images are widened, as packed bits would need inverting
+        gray_image = processed_image if processed_image.mode == 'L' else processed_image.convert('L')
+        api.SetImageBytes(gray_image.tobytes(), gray_image.width, gray_image.height, 1, gray_image.width)
+        api.SetSourceResolution(_RENDER_DPI)
+        return api.GetUTF8Text()
+    return pytesseract.image_to_string(processed_image, lang="eng")
+
+def _ocr_page_file(page_path):
+    """
+    OCR one rendered page image in a worker process, then delete the image.
+    """
+    try:
+        with Image.open(page_path) as page:
+            return _ocr_image(page)
+    finally:
+        os.remove(page_path)
+
+def _ocr_pages_batch(pages):
+    """
+    OCR several pages with one tesseract process reading a list of page images,
+    instead of starting tesseract once per page.
+    Returns the page texts in page order, each ending with tesseract's form feed
+    as image_to_string output does.
+    """
+    with tempfile.TemporaryDirectory() as work_dir:
+        page_paths = []
+        for page_num, page in enumerate(pages, 1):
+            page_path = os.path.join(work_dir, f'page-{page_num}.png')
+            utils.save_image(utils.preprocess_image(page), page_path, image_format='PNG')
+            page_paths.append(page_path)
+        list_path = os.path.join(work_dir, 'pages.txt')
+        with open(list_path, 'w', encoding='utf-8') as list_file:
+            list_file.write('\n'.join(page_paths) + '\n')
+        output_base = os.path.join(work_dir, 'output')
+        subprocess.run(
+            [pytesseract.pytesseract.tesseract_cmd, list_path, output_base, '-l', 'eng'],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=True
+        )
+        with open(output_base + '.txt', encoding='utf-8') as output_file:
+            texts = output_file.read().split('\f')
+    if len(texts) != len(pages) + 1:
+        raise ValueError(f"tesseract returned {len(texts) - 1} pages for {len(pages)} images")
+    return [text + '\f' for text in texts[:-1]]
+
+# Page rendering resolution for both renderers; 150 dpi is plenty for typeset
+# reports and gives Tesseract about half the pixels of pdf2image's default 200.
+# A malformed OCR_DPI, or one below 72, falls back to 150 instead of failing the import
+_RENDER_DPI = _env_int('OCR_DPI', 150, minimum=72)
+
+def _render_page(page):
+    """
+    Render one PyMuPDF page as a grayscale PIL image.
+    """
+    pixmap = page.get_pixmap(dpi=_RENDER_DPI, colorspace=fitz.csGRAY)
+    return Image.frombytes('L', (pixmap.width, pixmap.height), pixmap.samples)
+
+def _page_files(document, output_folder):
+    """
+    Render a PyMuPDF document one page at a time into PNG files in output_folder,
+    yielding each page's number and path as soon as it is written.
+    """
+    for page_num, page in enumerate(document, 1):
+        page_path = os.path.join(output_folder, f'page-{page_num}.png')
+        utils.save_image(_render_page(page), page_path, image_format='PNG')
+        yield page_num, page_path
+
+def _load_page_file(page_path):
+    with Image.open(page_path) as page:
+        return page.copy()
+
+def _init_ocr_worker():
+    # One Tesseract thread per worker; the pool already keeps every core busy
+    os.environ['OMP_THREAD_LIMIT'] = '1'
+    # Load the tesserocr model now, while the first page is still being rendered
+    _get_tess_api()
+
+def _ocr_pages(pages):
+    """
+    OCR page images in this process, with one tesseract run for several pages
+    when tesserocr is not available.
+    """
+    if len(pages) > 1 and _get_tess_api() is None:
+        try:
+            return _ocr_pages_batch(pages)
+        except (OSError, ValueError, subprocess.CalledProcessError) as e:
+            logger.warning("Batch OCR failed, falling back to per-page OCR: %s", e)
+    return [_ocr_image(page) for page in pages]
+
+def _ocr_page_files(page_files, workers):
+    """
+    OCR (page number, image path) pairs on a pool of worker processes, submitting
+    each page as soon as page_files yields it.
+    Returns the page texts in page order.
+    """
+    # fork avoids re-importing this module in every worker where it is available
+    context = multiprocessing.get_context('fork') if 'fork' in multiprocessing.get_all_start_methods() else None
+    texts = {}
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_ocr_worker) as executor:
+        futures = {}
+        for page_num, page_path in page_files:
+            futures[executor.submit(_ocr_page_file, page_path)] = page_num
+        for future in as_completed(futures):
+            texts[futures[future]] = future.result()
+    return [texts[page_num] for page_num in sorted(texts)]
+
+def _ocr_document(file_path, poppler_path=None):
+    """
+    Rasterize the PDF and OCR its pages, on all cores when there are several.
+    With PyMuPDF each page goes to an OCR worker as soon as it is rendered, so
+    rendering and Tesseract overlap. With poppler a single pdftoppm run renders
+    every page first, rather than starting pdftoppm (and re-parsing the PDF) once
+    per page.
+    Returns the page texts in page order.
+    """
+    cpus = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as output_folder:
+        if fitz is not None:
+            with fitz.open(file_path) as document:
+                workers = min(cpus, document.page_count)
+                if workers < 2:
+                    return _ocr_pages([_render_page(page) for page in document])
+                return _ocr_page_files(_page_files(document, output_folder), workers)
+        
+        page_paths = convert_from_path(
+            file_path,
+            dpi=_RENDER_DPI,
+            poppler_path=poppler_path,
+            output_folder=output_folder,
+            paths_only=True,
+            fmt='png',
+            grayscale=True
+        )
+        workers = min(cpus, len(page_paths))
+        if workers < 2:
+            return _ocr_pages([_load_page_file(page_path) for page_path in page_paths])
+        return _ocr_page_files(enumerate(page_paths, 1), workers)
+
+# Bounds on the OCR cache: entries older than the age are misses and are deleted,
+# and only the newest entries are kept
+OCR_CACHE_MAX_ENTRIES = _env_int('OCR_CACHE_MAX_ENTRIES', 256)
+OCR_CACHE_MAX_AGE = _env_int('OCR_CACHE_MAX_AGE', 7 * 24 * 3600)
+
+# Bump when a change to rendering or OCR makes existing cache entries stale
+_OCR_CACHE_VERSION = 1
+
+def _ocr_settings():
+    """
+    Everything besides the PDF itself that the OCR text depends on.
+    """
+    return (
+        _OCR_CACHE_VERSION,
+        _RENDER_DPI,
+        'pymupdf' if fitz is not None else 'poppler',
+        utils.THRESHOLD_METHOD,
+        'tesserocr' if PyTessBaseAPI is not None else 'tesseract-cli',
+    )
+
+def _cache_key(file_path):
+    digest = hashlib.sha256(repr(_ocr_settings()).encode('utf-8'))
+    with open(file_path, 'rb') as pdf_file:
+        for chunk in iter(lambda: pdf_file.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _cache_dir():
+    """
+    Create OCR_CACHE_DIR if needed and return it, or None when it is not a directory
+    owned by this user with mode 0700 (anyone else could read or plant report text).
+    """
+    if not hasattr(os, 'getuid'):
+        logger.warning("OCR cache needs POSIX file ownership, not caching")
+        return None
+    try:
+        os.makedirs(OCR_CACHE_DIR, mode=0o700, exist_ok=True)
+        dir_stat = os.lstat(OCR_CACHE_DIR)
+    except OSError as e:
+        logger.warning("Could not create OCR cache directory: %s", e)
+        return None
+    if (not stat.S_ISDIR(dir_stat.st_mode) or dir_stat.st_uid != os.getuid()
+            or stat.S_IMODE(dir_stat.st_mode) != 0o700):
+        logger.warning("Refusing OCR cache directory %s: must be a directory owned by uid %d with mode 0700",
+                       OCR_CACHE_DIR, os.getuid())
+        return None
+    return OCR_CACHE_DIR
+
+def _prune_cache(cache_dir):
+    """
+    Delete expired entries, then the oldest ones beyond OCR_CACHE_MAX_ENTRIES.
+    """
+    expiry = time.time() - OCR_CACHE_MAX_AGE
+    entries = []
+    with os.scandir(cache_dir) as dir_entries:
+        for entry in dir_entries:
+            if entry.name.endswith('.json'):
+                entries.append((entry.stat().st_mtime, entry.path))
+    entries.sort(reverse=True)
+    for index, (mtime, path) in enumerate(entries):
+        if mtime < expiry or index >= OCR_CACHE_MAX_ENTRIES:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+def _read_cache(cache_path):
+    try:
+        if os.stat(cache_path).st_mtime < time.time() - OCR_CACHE_MAX_AGE:
+            return None
+        with open(cache_path, encoding='utf-8') as cache_file:
+            texts = json.load(cache_file)
+    except (OSError, ValueError):
+        return None
+    if isinstance(texts, list) and all(isinstance(text, str) for text in texts):
+        return texts
+    return None
+
+def _write_cache(cache_dir, cache_path, texts):
+    # Report text is patient data: files inside the owner-only directory, written atomically
+    temp_path = None
+    try:
+        fd, temp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as cache_file:
+            json.dump(texts, cache_file)
+        os.replace(temp_path, cache_path)
+        _prune_cache(cache_dir)
+    except OSError as e:
+        logger.warning("Could not write OCR cache: %s", e)
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def ocr_document(file_path, poppler_path=None):
+    """
+    OCR every page of the PDF and return the page texts in page order.
+    When OCR_CACHE_DIR is set the texts are cached there by the SHA-256 of the OCR
+    settings and the PDF, so re-processing the same report skips rendering and
+    Tesseract entirely.
+    """
+    cache_dir = _cache_dir() if OCR_CACHE_DIR else None
+    if cache_dir is None:
+        return _ocr_document(file_path, poppler_path)
+    
+    cache_path = os.path.join(cache_dir, _cache_key(file_path) + '.json')
+    texts = _read_cache(cache_path)
+    if texts is None:
+        texts = _ocr_document(file_path, poppler_path)
+        _write_cache(cache_dir, cache_path, texts)
+    return texts
+
 def extract(file_path, file_format, test_type_id=None):
     try:
         # In Docker, poppler tools are in PATH
-        if os.getenv('NODE_ENV') == 'production':
-            pages = convert_from_path(file_path)
-        else:
-            pages = convert_from_path(file_path, poppler_path=POPPLER_PATH)
+        poppler_path = None if os.getenv('NODE_ENV') == 'production' else POPPLER_PATH
         
-        document_text = ""
+        # Leading "" keeps the newline the document text has always started with
+        document_parts = [""]
 
-        for page_num, page in enumerate(pages, 1):
-            processed_image = utils.preprocess_image(page)
-            text = pytesseract.image_to_string(processed_image, lang="eng")
-            document_text = document_text + "\n" + text
+        for page_num, text in enumerate(ocr_document(file_path, poppler_path), 1):
+            document_parts.append(text)
             
             # Log each page's OCR text for debugging
-            print(f"=== PAGE {page_num} OCR TEXT ===", file=sys.stderr)
-            print(repr(text), file=sys.stderr)
-            print("=== END PAGE OCR TEXT ===", file=sys.stderr)
+            logger.debug("Page %d OCR text: %r", page_num, text)
+
+        document_text = "\n".join(document_parts)
 
         # Log complete document text
-        print("=== COMPLETE DOCUMENT OCR TEXT ===", file=sys.stderr)
-        print(repr(document_text), file=sys.stderr)
-        print("=== END COMPLETE OCR TEXT ===", file=sys.stderr)
+        logger.debug("Complete document OCR text: %r", document_text)
 
         # Get test type configuration from database
-        print(f"=== GETTING TEST TYPE CONFIGURATION ===", file=sys.stderr)
+        logger.debug("Getting test type configuration")
         
         if test_type_id:
             # If test type ID is provided, use it to get configuration
             test_type_config = db_helper.get_test_type_config(test_type_id)
-            print(f"=== USING TEST TYPE ID: {test_type_id} ===", file=sys.stderr)
+            logger.debug("Using test type ID: %s", test_type_id)
         else:
             # Otherwise, use file format to get configuration
             test_type_config = db_helper.get_test_type_by_format(file_format)
-            print(f"=== USING FILE FORMAT: {file_format} ===", file=sys.stderr)
+            logger.debug("Using file format: %s", file_format)
         
-        print(f"=== TEST TYPE CONFIG: {test_type_config.get('label', 'Unknown')} ===", file=sys.stderr)
+        logger.debug("Test type config: %s", test_type_config.get('label', 'Unknown'))
         
         # Create parser using the factory
-        print(f"=== CREATING DYNAMIC PARSER ===", file=sys.stderr)
+        logger.debug("Creating dynamic parser")
         parser = parser_factory.create_parser(document_text, test_type_config)
         
         # Parse the document
-        print(f"=== PARSING DOCUMENT ===", file=sys.stderr)
+        logger.debug("Parsing document")
         extracted_data = parser.parse()
         
-        print(f"=== PARSED DATA ===", file=sys.stderr)
-        print(json.dumps(extracted_data, indent=2), file=sys.stderr)
-        print("=== END PARSED DATA ===", file=sys.stderr)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Parsed data: %s", json.dumps(extracted_data, indent=2))
         
         return extracted_data
         
     except Exception as e:
-        print(f"=== EXTRACTION ERROR ===", file=sys.stderr)
-        print(str(e), file=sys.stderr)
-        print("=== END ERROR ===", file=sys.stderr)
+        logger.error("Extraction error: %s", e)
         raise Exception(f"Extraction failed: {str(e)}")
 
 if __name__ == "__main__":
+    # Production only reports problems; development keeps the full extraction trace
+    logging.basicConfig(
+        level=logging.INFO if os.getenv('NODE_ENV') == 'production' else logging.DEBUG,
+        format='%(message)s',
+        stream=sys.stderr
+    )
+    
     if len(sys.argv) < 3:
         print(json.dumps({"error": "Usage: python extractor.py <file_path> <file_format> [test_type_id]"}))
         sys.exit(1)
@@ -86,11 +391,7 @@ if __name__ == "__main__":
     file_format = sys.argv[2]
     test_type_id = int(sys.argv[3]) if len(sys.argv) > 3 and sys.argv[3].isdigit() else None
     
-    print(f"=== STARTING DYNAMIC EXTRACTION ===", file=sys.stderr)
-    print(f"File: {file_path}", file=sys.stderr)
-    print(f"Format: {file_format}", file=sys.stderr)
-    print(f"Test Type ID: {test_type_id}", file=sys.stderr)
-    print("=== BEGIN PROCESSING ===", file=sys.stderr)
+    logger.debug("Starting dynamic extraction: file=%s format=%s test_type_id=%s", file_path, file_format, test_type_id)
     
     try:
         result = extract(file_path, file_format, test_type_id)
@@ -5,14 +5,23 @@ This avoids issues with process hanging in Ballerina
 """
 
 import sys
+import copy
 import json
+import logging
 import os
 from datetime import datetime
-from pdf2image import convert_from_path
 import pytesseract
-import utils
 from db_helper import db_helper
 from parser_factory import parser_factory
+from extractor import ocr_document
+
+try:
+    # Optional: faster JSON encoding of the result file
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger('medilink.lab')
 
 # Use environment variables in Docker, fallback to hardcoded paths for local development
 POPPLER_PATH = os.getenv('POPPLER_PATH', r"C:/poppler-24.08.0/Library/bin")
@@ -24,62 +33,62 @@ if os.getenv('NODE_ENV') == 'production':
 else:
     pytesseract.pytesseract.tesseract_cmd = TESSERACT_ENGINE_PATH
 
+# Lipid panel configuration forced for test_type_id 1 (overrides the database).
+# Built once; each extraction gets its own deep copy, so changes don't leak between runs.
+LIPID_PANEL_CONFIG = {
+    "id": 1,
+    "label": "Lipid Panel", 
+    "parser_module": "parser_lab_report",
+    "parser_class": "LabReportParser",
+    "report_fields": [
+        {"name": "Total_Cholesterol", "type": "number", "unit": "mg/dL", "required": False},
+        {"name": "HDL_Cholesterol", "type": "number", "unit": "mg/dL", "required": False},
+        {"name": "LDL_Cholesterol", "type": "number", "unit": "mg/dL", "required": False},
+        {"name": "Triglycerides", "type": "number", "unit": "mg/dL", "required": False},
+        {"name": "Cholesterol", "type": "number", "unit": "mg/dL", "required": False}
+    ]
+}
+
 def real_extract(file_path, file_format, test_type_id=None):
     """Perform real OCR-based extraction"""
     try:
         # In Docker, poppler tools are in PATH
-        if os.getenv('NODE_ENV') == 'production':
-            pages = convert_from_path(file_path)
-        else:
-            pages = convert_from_path(file_path, poppler_path=POPPLER_PATH)
+        poppler_path = None if os.getenv('NODE_ENV') == 'production' else POPPLER_PATH
         
-        document_text = ""
-
-        for page_num, page in enumerate(pages, 1):
-            processed_image = utils.preprocess_image(page)
-            text = pytesseract.image_to_string(processed_image, lang="eng")
-            document_text = document_text + "\n" + text
+        # Pages are OCRed in parallel worker processes (or batched on one core),
+        # unless this exact PDF is in the opt-in OCR cache
+        texts = ocr_document(file_path, poppler_path)
+        
+        # Leading "" keeps the newline the document text has always started with
+        document_text = "\n".join(["", *texts])
 
-        # Debug: Print the extracted text
-        print(f"=== EXTRACTED OCR TEXT ===")
-        print(document_text)
-        print("=== END OCR TEXT ===")
+        # Debug: Log the extracted text
+        logger.debug("=== EXTRACTED OCR TEXT ===\n%s\n=== END OCR TEXT ===", document_text)
 
         # Try to get test type configuration from database
         test_type_config = None
         
         # For test_type_id = 1, force lipid panel configuration (override database)
         if test_type_id == 1:
-            print(f"=== FORCING LIPID PANEL CONFIG FOR TEST_TYPE_ID 1 ===")
-            test_type_config = {
-                "id": 1,
-                "label": "Lipid Panel", 
-                "parser_module": "parser_lab_report",
-                "parser_class": "LabReportParser",
-                "report_fields": [
-                    {"name": "Total_Cholesterol", "type": "number", "unit": "mg/dL", "required": False},
-                    {"name": "HDL_Cholesterol", "type": "number", "unit": "mg/dL", "required": False},
-                    {"name": "LDL_Cholesterol", "type": "number", "unit": "mg/dL", "required": False},
-                    {"name": "Triglycerides", "type": "number", "unit": "mg/dL", "required": False},
-                    {"name": "Cholesterol", "type": "number", "unit": "mg/dL", "required": False}
-                ]
-            }
+            logger.debug("=== FORCING LIPID PANEL CONFIG FOR TEST_TYPE_ID 1 ===")
+            test_type_config = copy.deepcopy(LIPID_PANEL_CONFIG)
         else:
             try:
                 if test_type_id:
                     # If test type ID is provided, use it to get configuration
                     test_type_config = db_helper.get_test_type_config(test_type_id)
-                    print(f"=== DATABASE CONFIG RETRIEVED FOR TEST_TYPE_ID {test_type_id} ===")
-                    print(f"Label: {test_type_config.get('label', 'Unknown')}")
-                    print(f"Parser: {test_type_config.get('parser_class', 'Unknown')}")
-                    print(f"Fields: {[f.get('name', 'Unknown') for f in test_type_config.get('report_fields', [])]}")
+                    logger.debug("=== DATABASE CONFIG RETRIEVED FOR TEST_TYPE_ID %s ===", test_type_id)
+                    logger.debug("Label: %s", test_type_config.get('label', 'Unknown'))
+                    logger.debug("Parser: %s", test_type_config.get('parser_class', 'Unknown'))
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Fields: %s", [f.get('name', 'Unknown') for f in test_type_config.get('report_fields', [])])
                 else:
                     # Otherwise, use file format to get configuration
                     test_type_config = db_helper.get_test_type_by_format(file_format)
-                    print(f"=== DATABASE CONFIG RETRIEVED FOR FORMAT {file_format} ===")
-                    print(f"Label: {test_type_config.get('label', 'Unknown')}")
+                    logger.debug("=== DATABASE CONFIG RETRIEVED FOR FORMAT %s ===", file_format)
+                    logger.debug("Label: %s", test_type_config.get('label', 'Unknown'))
             except Exception as db_error:
-                print(f"Database connection failed, using default configuration: {db_error}")
+                logger.warning("Database connection failed, using default configuration: %s", db_error)
                 # Default configuration for lipid panel
                 test_type_config = {
                     "id": test_type_id or 1,
@@ -89,14 +98,15 @@ def real_extract(file_path, file_format, test_type_id=None):
                     "report_fields": []
                 }
 
-        print(f"=== FINAL CONFIG BEING USED ===")
-        print(f"Label: {test_type_config.get('label', 'Unknown')}")
-        print(f"Parser Module: {test_type_config.get('parser_module', 'Unknown')}")
-        print(f"Parser Class: {test_type_config.get('parser_class', 'Unknown')}")
-        if test_type_config.get('report_fields'):
-            print(f"Configured Fields: {[f.get('name', 'Unknown') for f in test_type_config.get('report_fields', [])]}")
-        else:
-            print("No report_fields configured - will use default extraction")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("=== FINAL CONFIG BEING USED ===")
+            logger.debug("Label: %s", test_type_config.get('label', 'Unknown'))
+            logger.debug("Parser Module: %s", test_type_config.get('parser_module', 'Unknown'))
+            logger.debug("Parser Class: %s", test_type_config.get('parser_class', 'Unknown'))
+            if test_type_config.get('report_fields'):
+                logger.debug("Configured Fields: %s", [f.get('name', 'Unknown') for f in test_type_config.get('report_fields', [])])
+            else:
+                logger.debug("No report_fields configured - will use default extraction")
         
         # Create parser using the factory
         parser = parser_factory.create_parser(document_text, test_type_config)
@@ -109,6 +119,18 @@ def real_extract(file_path, file_format, test_type_id=None):
     except Exception as e:
         raise Exception(f"Real extraction failed: {str(e)}")
 
+def _write_json(output_file, data):
+    """Write data to output_file as compact JSON (indented when DEBUG_JSON is set)"""
+    if os.getenv('DEBUG_JSON'):
+        with open(output_file, 'w') as f:
+            json.dump(data, f, indent=2)
+    elif orjson is not None:
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(output_file, 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+
 def extract_to_file(file_path, file_format, test_type_id, output_file):
     """Extract data and write to output file"""
     try:
@@ -121,7 +143,7 @@ def extract_to_file(file_path, file_format, test_type_id, output_file):
             extraction_method = "python_file_based_real"
         except Exception as real_error:
             # If real extraction fails, fall back to mock data
-            print(f"Real extraction failed: {real_error}, using fallback data")
+            logger.warning("Real extraction failed: %s, using fallback data", real_error)
             extracted_data = {
                 "patient_name": "Test Patient",
                 "test_date": "2024-01-15",
@@ -152,10 +174,9 @@ def extract_to_file(file_path, file_format, test_type_id, output_file):
         }
         
         # Write to output file
-        with open(output_file, 'w') as f:
-            json.dump(result, f, indent=2)
+        _write_json(output_file, result)
         
-        print(f"Extraction completed successfully, output written to {output_file}")
+        logger.info("Extraction completed successfully, output written to %s", output_file)
         return 0
         
     except Exception as e:
@@ -166,15 +187,23 @@ def extract_to_file(file_path, file_format, test_type_id, output_file):
         }
         
         try:
-            with open(output_file, 'w') as f:
-                json.dump(error_data, f, indent=2)
+            _write_json(output_file, error_data)
         except:
             pass  # If we can't write error file, just exit
             
-        print(f"Extraction failed: {e}")
+        logger.error("Extraction failed: %s", e)
         return 1
 
 if __name__ == "__main__":
+    # LOG_LEVEL=DEBUG brings back the OCR text and configuration trace;
+    # an unknown level name falls back to INFO rather than aborting the run
+    log_level = getattr(logging, os.getenv('LOG_LEVEL', 'INFO').upper(), None)
+    logging.basicConfig(
+        level=log_level if isinstance(log_level, int) else logging.INFO,
+        format='%(message)s',
+        stream=sys.stdout
+    )
+    
     if len(sys.argv) != 5:
         print("Usage: python extractor_file_based.py <file_path> <file_format> <test_type_id> <output_file>")
         sys.exit(1)
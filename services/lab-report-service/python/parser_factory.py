@@ -1,9 +1,106 @@
 #!/usr/bin/env python3
 import importlib
-import sys
 import json
 import re
-from base_parser import BaseParser
+import logging
+import functools
+from base_parser import BaseParser, _compile_linear, _union_of
+
+logger = logging.getLogger(__name__)
+
+
+def _compile_patterns(patterns_by_field):
+    """
+    Compile a {field name: [pattern, ...]} table into case-insensitive regexes
+    (paired with RE2 for ASCII text when MEDILINK_RE2=1; see _compile_linear).
+    """
+    return {
+        field_name: tuple(_compile_linear(pattern, re.IGNORECASE) for pattern in patterns)
+        for field_name, patterns in patterns_by_field.items()
+    }
+
+
+# Standard thyroid function test patterns
+_THYROID_SOURCES = {
+    'TSH': [
+        r'TSH[:\|\s]*([\d\.\-\+]+)\s*mIU/L',
+        r'Thyroid\s*Stimulating\s*Hormone[:\|\s]*([\d\.\-\+]+)',
+        r'\|\s*TSH\s*\|\s*([\d\.\-\+]+)\s*\|',
+        r'TSH[^\n\r0-9]{0,40}([+-]?\d+(?:\.\d+)?)',
+    ],
+    'Free T4': [
+        r'Free\s*T4[:\|\s]*([\d\.\-\+]+)\s*ng/dL',
+        r'Free\s*Thyroxine[:\|\s]*([\d\.\-\+]+)',
+        r'\|\s*Free\s*T4\s*\|\s*([\d\.\-\+]+)\s*\|',
+        r'Free\s*T4[^\n\r0-9]{0,40}([+-]?\d+(?:\.\d+)?)',
+    ],
+    'Free T3': [
+        r'Free\s*T3[:\|\s]*([\d\.\-\+]+)\s*pg/mL',
+        r'Free\s*Triiodothyronine[:\|\s]*([\d\.\-\+]+)',
+        r'\|\s*Free\s*T3\s*\|\s*([\d\.\-\+]+)\s*\|',
+        r'Free\s*T3[^\n\r0-9]{0,40}([+-]?\d+(?:\.\d+)?)',
+    ],
+    'T4:T3 Ratio': [
+        r'T4[:T]*\s*T3\s*Ratio[:\|\s]*([\d\.\-\+]+)',
+        r'T4/T3[:\|\s]*([\d\.\-\+]+)',
+        r'\|\s*T4:T3\s*Ratio\s*\|\s*([\d\.\-\+]+)\s*\|',
+    ],
+    'Free T4 Index': [
+        r'Free\s*T4\s*Index[:\|\s]*([\d\.\-\+]+)',
+        r'FTI[:\|\s]*([\d\.\-\+]+)',
+        r'\|\s*Free\s*T4\s*Index\s*\|\s*([\d\.\-\+]+)\s*\|',
+    ]
+}
+_THYROID_PATTERNS = _compile_patterns(_THYROID_SOURCES)
+
+# Standard FBC patterns
+_FBC_SOURCES = {
+    'RBC': [r'RBC[:.\s]*([\d\.]+\s*x?\s*10[\*\^]?12[/L]*)', r'Red\s*Blood\s*Cells?[:.\s]*([\d\.]+)'],
+    'Hemoglobin': [r'H[ae]moglobin[:.\s]*([\d\.]+\s*g/dL)', r'Hb[:.\s]*([\d\.]+)'],
+    'Hematocrit': [r'H[ae]matocrit[:.\s]*([\d\.]+\s*%)', r'Hct[:.\s]*([\d\.]+)'],
+    'WBC': [r'WBC[:.\s]*([\d\.]+\s*x?\s*10[\*\^]?9[/L]*)', r'White\s*Blood\s*Cells?[:.\s]*([\d\.]+)'],
+    'Platelets': [r'Platelets?[:.\s]*([\d\.]+\s*x?\s*10[\*\^]?9[/L]*)', r'PLT[:.\s]*([\d\.]+)'],
+    'MCV': [r'MCV[:.\s]*([\d\.]+\s*fL)', r'Mean\s*Cell\s*Volume[:.\s]*([\d\.]+)'],
+    'MCH': [r'MCH[:.\s]*([\d\.]+\s*pg)', r'Mean\s*Cell\s*Hemoglobin[:.\s]*([\d\.]+)'],
+    'MCHC': [r'MCHC[:.\s]*([\d\.]+\s*g/dL)', r'Mean\s*Cell\s*Hemoglobin\s*Concentration[:.\s]*([\d\.]+)']
+}
+_FBC_PATTERNS = _compile_patterns(_FBC_SOURCES)
+
+# Standard general lab patterns
+_LAB_SOURCES = {
+    'Glucose': [r'Glucose[:.\s]*([\d\.]+\s*mg/dL)', r'Blood\s*Sugar[:.\s]*([\d\.]+)'],
+    'Cholesterol': [r'Cholesterol[:.\s]*([\d\.]+\s*mg/dL)', r'Total\s*Cholesterol[:.\s]*([\d\.]+)'],
+    'Creatinine': [r'Creatinine[:.\s]*([\d\.]+\s*mg/dL)', r'Creat[:.\s]*([\d\.]+)'],
+    'BUN': [r'BUN[:.\s]*([\d\.]+\s*mg/dL)', r'Blood\s*Urea\s*Nitrogen[:.\s]*([\d\.]+)']
+}
+_LAB_PATTERNS = _compile_patterns(_LAB_SOURCES)
+
+_THYROID_UNION = _union_of(_THYROID_SOURCES.values())
+_FBC_UNION = _union_of(_FBC_SOURCES.values())
+_LAB_UNION = _union_of(_LAB_SOURCES.values())
+
+# Content detectors for reports without configured fields, matched against the lowercased text
+_THYROID_DETECT = re.compile(r'thyroid function|tsh|free t4|free t3|endocrine')
+_FBC_DETECT = re.compile(r'full blood count|complete blood count|fbc|cbc|hemoglobin|hematocrit')
+_LAB_DETECT = re.compile(r'cholesterol|glucose|creatinine|urea')
+
+# Improved basic pattern to avoid fragmented matches
+# Look for complete parameter-value pairs
+_BASIC_PATTERNS = tuple(_compile_linear(pattern, re.IGNORECASE) for pattern in [
+    # Pattern 1: Parameter: Value Unit (more restrictive)
+    r'([A-Za-z][A-Za-z\s]{2,25})[:\.]\s*([\d\.\-\+]+(?:\s*x?\s*10[\*\^]?[\d\-\+]*)?)\s*([A-Za-z/%\^\*\s]{0,15})',
+    # Pattern 2: Parameter (Abbrev): Value
+    r'([A-Za-z\s]+)\s*\([A-Za-z0-9]+\)[:\.]\s*([\d\.\-\+]+)',
+    # Pattern 3: Single word parameter: value
+    r'([A-Z][A-Za-z]{2,15})[:\.]\s*([\d\.\-\+]+)',
+])
+
+# Characters stripped from field names found by the basic patterns
+_FIELD_NAME_JUNK = re.compile(r'[^\w\s\(\)]')
+
+# Field names the basic patterns must never report
+_GENERIC_FIELD_NAMES = frozenset({'test', 'result', 'reference', 'units', 'status', 'normal', 'report', 'date', 'page'})
+
 
 class DynamicParserFactory:
     """
@@ -12,6 +109,26 @@ class DynamicParserFactory:
     
     def __init__(self):
         self.parser_cache = {}
+        self.class_cache = {}
+        
+        # Import the known parsers up front so the first report after OCR doesn't pay for it
+        for parser_info in self.get_available_parsers():
+            try:
+                self._resolve_parser(parser_info['module'], parser_info['class'])
+            except (ImportError, AttributeError):
+                pass
+    
+    def _resolve_parser(self, parser_module, parser_class):
+        """
+        Return the parser class, importing its module on first use.
+        """
+        parser_cls = self.class_cache.get((parser_module, parser_class))
+        if parser_cls is None:
+            if parser_module not in self.parser_cache:
+                self.parser_cache[parser_module] = importlib.import_module(parser_module)
+            parser_cls = getattr(self.parser_cache[parser_module], parser_class)
+            self.class_cache[(parser_module, parser_class)] = parser_cls
+        return parser_cls
     
     def create_parser(self, text, test_type_config):
         """
@@ -28,27 +145,22 @@ class DynamicParserFactory:
         parser_class = test_type_config.get('parser_class')
         
         if not parser_module or not parser_class:
-            print(f"=== USING GENERIC PARSER ===", file=sys.stderr)
+            logger.debug("=== USING GENERIC PARSER ===")
             return GenericParser(text, test_type_config)
         
         try:
-            # Try to import the specified parser module
             if parser_module not in self.parser_cache:
-                print(f"=== IMPORTING PARSER MODULE: {parser_module} ===", file=sys.stderr)
-                module = importlib.import_module(parser_module)
-                self.parser_cache[parser_module] = module
-            else:
-                module = self.parser_cache[parser_module]
+                logger.debug("=== IMPORTING PARSER MODULE: %s ===", parser_module)
+            parser_cls = self._resolve_parser(parser_module, parser_class)
             
-            # Get the parser class from the module
-            parser_cls = getattr(module, parser_class)
-            
-            print(f"=== CREATING PARSER: {parser_class} ===", file=sys.stderr)
+            logger.debug("=== CREATING PARSER: %s ===", parser_class)
             return parser_cls(text, test_type_config)
             
         except (ImportError, AttributeError) as e:
-            print(f"=== PARSER IMPORT ERROR: {str(e)} ===", file=sys.stderr)
-            print(f"=== FALLING BACK TO GENERIC PARSER ===", file=sys.stderr)
+            logger.warning("=== PARSER IMPORT ERROR: %s ===", e)
+            logger.warning("=== FALLING BACK TO GENERIC PARSER ===")
+            # Remember the fallback so later reports don't search sys.path again
+            self.class_cache[(parser_module, parser_class)] = GenericParser
             return GenericParser(text, test_type_config)
     
     def get_available_parsers(self):
@@ -97,136 +209,100 @@ class GenericParser(BaseParser):
         """
         report_fields = self.test_type_config.get('report_fields', [])
         
-        print(f"=== GENERIC PARSER: Processing {len(report_fields)} configured fields ===", file=sys.stderr)
+        logger.debug("=== GENERIC PARSER: Processing %d configured fields ===", len(report_fields))
         
         # If no fields are configured, try intelligent content detection
         if len(report_fields) == 0:
-            print("=== GENERIC PARSER: No configured fields, attempting content detection ===", file=sys.stderr)
+            logger.debug("=== GENERIC PARSER: No configured fields, attempting content detection ===")
             self._detect_and_extract_content()
             return
         
-        for field_config in report_fields:
+        pattern_groups, union, lower_union = self._configured_patterns(tuple(
+            (field_config['name'], field_config.get('type', 'text') in ['number', 'decimal'], field_config.get('unit', ''))
+            for field_config in report_fields
+        ))
+        values = self._extract_union(pattern_groups, union, lower_union)
+        
+        found = {}
+        for field_config, value in zip(report_fields, values):
             field_name = field_config['name']
             field_type = field_config.get('type', 'text')
             unit = field_config.get('unit', '')
             required = field_config.get('required', False)
             
-            print(f" Processing field: {field_name} (type: {field_type}, unit: {unit})", file=sys.stderr)
+            logger.debug(" Processing field: %s (type: %s, unit: %s)", field_name, field_type, unit)
             
-            if field_type in ['number', 'decimal']:
-                # For numeric fields, try to extract with units
-                patterns = self._generate_numeric_patterns(field_name, unit)
-                value = self._extract_numeric_value(self.text, patterns, unit)
-            else:
-                # For text fields, try to extract text
-                patterns = self._generate_text_patterns(field_name)
-                value = self._extract_text_value(patterns)
+            # Numeric fields carry their configured unit
+            if value and field_type in ['number', 'decimal'] and unit and unit not in value:
+                value += f' {unit}'
             
             if value:
-                self.report_data[field_name] = value
-                print(f" Found {field_name}: {value}", file=sys.stderr)
+                found[field_name] = value
+                logger.debug(" Found %s: %s", field_name, value)
             elif required:
-                print(f" Warning: Required field '{field_name}' not found", file=sys.stderr)
+                logger.warning("Required field '%s' not found", field_name)
+        
+        self.report_data.update(found)
     
     def _detect_and_extract_content(self):
         """
         Detect content type and extract accordingly when no fields are configured.
         """
-        text_lower = self.text.lower()
+        text_lower = self._text_lower
         
         # Check for thyroid function content
-        if any(keyword in text_lower for keyword in ['thyroid function', 'tsh', 'free t4', 'free t3', 'endocrine']):
-            print("=== DETECTED THYROID CONTENT: Using thyroid extraction patterns ===", file=sys.stderr)
+        if _THYROID_DETECT.search(text_lower):
+            logger.debug("=== DETECTED THYROID CONTENT: Using thyroid extraction patterns ===")
             self._extract_thyroid_patterns()
         # Check for FBC/CBC content
-        elif any(keyword in text_lower for keyword in ['full blood count', 'complete blood count', 'fbc', 'cbc', 'hemoglobin', 'hematocrit']):
-            print("=== DETECTED FBC CONTENT: Using FBC extraction patterns ===", file=sys.stderr)
+        elif _FBC_DETECT.search(text_lower):
+            logger.debug("=== DETECTED FBC CONTENT: Using FBC extraction patterns ===")
             self._extract_fbc_patterns()
-        elif any(keyword in text_lower for keyword in ['cholesterol', 'glucose', 'creatinine', 'urea']):
-            print("=== DETECTED LAB CONTENT: Using general lab patterns ===", file=sys.stderr)
+        elif _LAB_DETECT.search(text_lower):
+            logger.debug("=== DETECTED LAB CONTENT: Using general lab patterns ===")
             self._extract_lab_patterns()
         else:
-            print("=== GENERIC CONTENT: Using enhanced table extraction ===", file=sys.stderr)
+            logger.debug("=== GENERIC CONTENT: Using enhanced table extraction ===")
             self._extract_enhanced_table_data()
     
     def _extract_thyroid_patterns(self):
         """
         Extract thyroid function test values using standard patterns.
         """
-        thyroid_patterns = {
-            'TSH': [
-                r'TSH[:\|\s]*([\d\.\-\+]+)\s*mIU/L',
-                r'Thyroid\s*Stimulating\s*Hormone[:\|\s]*([\d\.\-\+]+)',
-                r'\|\s*TSH\s*\|\s*([\d\.\-\+]+)\s*\|',
-                r'TSH.*?([\d\.\-\+]+)',
-            ],
-            'Free T4': [
-                r'Free\s*T4[:\|\s]*([\d\.\-\+]+)\s*ng/dL',
-                r'Free\s*Thyroxine[:\|\s]*([\d\.\-\+]+)',
-                r'\|\s*Free\s*T4\s*\|\s*([\d\.\-\+]+)\s*\|',
-                r'Free\s*T4.*?([\d\.\-\+]+)',
-            ],
-            'Free T3': [
-                r'Free\s*T3[:\|\s]*([\d\.\-\+]+)\s*pg/mL',
-                r'Free\s*Triiodothyronine[:\|\s]*([\d\.\-\+]+)',
-                r'\|\s*Free\s*T3\s*\|\s*([\d\.\-\+]+)\s*\|',
-                r'Free\s*T3.*?([\d\.\-\+]+)',
-            ],
-            'T4:T3 Ratio': [
-                r'T4[:T]*\s*T3\s*Ratio[:\|\s]*([\d\.\-\+]+)',
-                r'T4/T3[:\|\s]*([\d\.\-\+]+)',
-                r'\|\s*T4:T3\s*Ratio\s*\|\s*([\d\.\-\+]+)\s*\|',
-            ],
-            'Free T4 Index': [
-                r'Free\s*T4\s*Index[:\|\s]*([\d\.\-\+]+)',
-                r'FTI[:\|\s]*([\d\.\-\+]+)',
-                r'\|\s*Free\s*T4\s*Index\s*\|\s*([\d\.\-\+]+)\s*\|',
-            ]
-        }
         
-        for field_name, patterns in thyroid_patterns.items():
-            value = self._extract_numeric_value(self.text, patterns)
+        values = self._extract_union(_THYROID_PATTERNS.values(), _THYROID_UNION)
+        found = {}
+        for field_name, value in zip(_THYROID_PATTERNS, values):
             if value:
-                self.report_data[field_name] = value
-                print(f" Found thyroid field {field_name}: {value}", file=sys.stderr)
+                found[field_name] = value
+                logger.debug(" Found thyroid field %s: %s", field_name, value)
+        self.report_data.update(found)
     
     def _extract_fbc_patterns(self):
         """
         Extract FBC values using standard patterns.
         """
-        fbc_patterns = {
-            'RBC': [r'RBC[:.\s]*([\d\.]+\s*x?\s*10[\*\^]?12[/L]*)', r'Red\s*Blood\s*Cells?[:.\s]*([\d\.]+)'],
-            'Hemoglobin': [r'H[ae]moglobin[:.\s]*([\d\.]+\s*g/dL)', r'Hb[:.\s]*([\d\.]+)'],
-            'Hematocrit': [r'H[ae]matocrit[:.\s]*([\d\.]+\s*%)', r'Hct[:.\s]*([\d\.]+)'],
-            'WBC': [r'WBC[:.\s]*([\d\.]+\s*x?\s*10[\*\^]?9[/L]*)', r'White\s*Blood\s*Cells?[:.\s]*([\d\.]+)'],
-            'Platelets': [r'Platelets?[:.\s]*([\d\.]+\s*x?\s*10[\*\^]?9[/L]*)', r'PLT[:.\s]*([\d\.]+)'],
-            'MCV': [r'MCV[:.\s]*([\d\.]+\s*fL)', r'Mean\s*Cell\s*Volume[:.\s]*([\d\.]+)'],
-            'MCH': [r'MCH[:.\s]*([\d\.]+\s*pg)', r'Mean\s*Cell\s*Hemoglobin[:.\s]*([\d\.]+)'],
-            'MCHC': [r'MCHC[:.\s]*([\d\.]+\s*g/dL)', r'Mean\s*Cell\s*Hemoglobin\s*Concentration[:.\s]*([\d\.]+)']
-        }
         
-        for field_name, patterns in fbc_patterns.items():
-            value = self._extract_numeric_value(self.text, patterns)
+        values = self._extract_union(_FBC_PATTERNS.values(), _FBC_UNION)
+        found = {}
+        for field_name, value in zip(_FBC_PATTERNS, values):
             if value:
-                self.report_data[field_name] = value
-                print(f" Found FBC field {field_name}: {value}", file=sys.stderr)
+                found[field_name] = value
+                logger.debug(" Found FBC field %s: %s", field_name, value)
+        self.report_data.update(found)
     
     def _extract_lab_patterns(self):
         """
         Extract general lab values using standard patterns.
         """
-        lab_patterns = {
-            'Glucose': [r'Glucose[:.\s]*([\d\.]+\s*mg/dL)', r'Blood\s*Sugar[:.\s]*([\d\.]+)'],
-            'Cholesterol': [r'Cholesterol[:.\s]*([\d\.]+\s*mg/dL)', r'Total\s*Cholesterol[:.\s]*([\d\.]+)'],
-            'Creatinine': [r'Creatinine[:.\s]*([\d\.]+\s*mg/dL)', r'Creat[:.\s]*([\d\.]+)'],
-            'BUN': [r'BUN[:.\s]*([\d\.]+\s*mg/dL)', r'Blood\s*Urea\s*Nitrogen[:.\s]*([\d\.]+)']
-        }
         
-        for field_name, patterns in lab_patterns.items():
-            value = self._extract_numeric_value(self.text, patterns)
+        values = self._extract_union(_LAB_PATTERNS.values(), _LAB_UNION)
+        found = {}
+        for field_name, value in zip(_LAB_PATTERNS, values):
             if value:
-                self.report_data[field_name] = value
-                print(f" Found lab field {field_name}: {value}", file=sys.stderr)
+                found[field_name] = value
+                logger.debug(" Found lab field %s: %s", field_name, value)
+        self.report_data.update(found)
     
     def _extract_enhanced_table_data(self):
         """
@@ -234,8 +310,7 @@ class GenericParser(BaseParser):
         """
         # Use the enhanced table extraction from base parser
         table_data = self._extract_table_rows(self.text)
-        for field_name, value in table_data.items():
-            self.report_data[field_name] = value
+        self.report_data.update(table_data)
         
         # If still no data, try the basic patterns as final fallback
         if not table_data:
@@ -247,18 +322,9 @@ class GenericParser(BaseParser):
         """
         # Improved basic pattern to avoid fragmented matches
         # Look for complete parameter-value pairs
-        basic_patterns = [
-            # Pattern 1: Parameter: Value Unit (more restrictive)
-            r'([A-Za-z][A-Za-z\s]{2,25})[:\.]\s*([\d\.\-\+]+(?:\s*x?\s*10[\*\^]?[\d\-\+]*)?)\s*([A-Za-z/%\^\*\s]{0,15})',
-            # Pattern 2: Parameter (Abbrev): Value
-            r'([A-Za-z\s]+)\s*\([A-Za-z0-9]+\)[:\.]\s*([\d\.\-\+]+)',
-            # Pattern 3: Single word parameter: value
-            r'([A-Z][A-Za-z]{2,15})[:\.]\s*([\d\.\-\+]+)',
-        ]
         
-        for pattern in basic_patterns:
-            matches = re.finditer(pattern, self.text, re.IGNORECASE)
-            for match in matches:
+        for pattern in _BASIC_PATTERNS:
+            for match in pattern.finditer(self.text):
                 groups = match.groups()
                 if len(groups) >= 2:
                     field_name = groups[0].strip()
@@ -266,11 +332,11 @@ class GenericParser(BaseParser):
                     unit = groups[2].strip() if len(groups) > 2 else ''
                     
                     # Clean field name and apply filters
-                    field_name = re.sub(r'[^\w\s\(\)]', '', field_name).strip()
+                    field_name = _FIELD_NAME_JUNK.sub('', field_name).strip()
                     
                     # Skip if field name is too short, too long, or generic
                     if (len(field_name) < 3 or len(field_name) > 30 or 
-                        field_name.lower() in ['test', 'result', 'reference', 'units', 'status', 'normal', 'report', 'date', 'page']):
+                        field_name.lower() in _GENERIC_FIELD_NAMES):
                         continue
                     
                     # Skip if field name is already found
@@ -284,9 +350,27 @@ class GenericParser(BaseParser):
                         full_value = value
                         
                     self.report_data[field_name] = full_value
-                    print(f" Found basic field {field_name}: {full_value}", file=sys.stderr)
+                    logger.debug(" Found basic field %s: %s", field_name, full_value)
     
-    def _generate_numeric_patterns(self, field_name, unit=''):
+    @classmethod
+    @functools.lru_cache(maxsize=128)
+    def _configured_patterns(cls, field_specs):
+        """
+        Build the pattern groups and their union (plus its lowercase counterpart)
+        for (name, numeric, unit) field specs.
+        """
+        source_groups = [
+            cls._generate_numeric_patterns(field_name, unit) if numeric else cls._generate_text_patterns(field_name)
+            for field_name, numeric, unit in field_specs
+        ]
+        pattern_groups = tuple(
+            tuple(_compile_linear(pattern, re.IGNORECASE) for pattern in patterns)
+            for patterns in source_groups
+        )
+        return pattern_groups, _union_of(source_groups), _union_of(source_groups, lowercase=True)
+    
+    @staticmethod
+    def _generate_numeric_patterns(field_name, unit=''):
         """
         Generate regex patterns for numeric fields.
         """
@@ -301,7 +385,8 @@ class GenericParser(BaseParser):
         
         return patterns
     
-    def _generate_text_patterns(self, field_name):
+    @staticmethod
+    def _generate_text_patterns(field_name):
         """
         Generate regex patterns for text fields.
         """
@@ -313,16 +398,6 @@ class GenericParser(BaseParser):
         ]
         
         return patterns
-    
-    def _extract_text_value(self, patterns):
-        """
-        Extract text value using the given patterns.
-        """
-        for pattern in patterns:
-            match = re.search(pattern, self.text, re.IGNORECASE)
-            if match:
-                return match.group(1).strip()
-        return None
 
 
 # Factory instance for global use
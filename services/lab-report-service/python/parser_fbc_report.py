@@ -1,6 +1,158 @@
 import re
-import sys
-from base_parser import BaseParser
+import logging
+import functools
+from base_parser import BaseParser, _META_FIELDS, _compile_linear, _union_of
+
+logger = logging.getLogger(__name__)
+
+# Hardcoded FBC parameters used when no fields are configured
+_DEFAULT_FBC_SOURCES = {
+    'RBC': {
+        'patterns': [
+            r'RBC[:.\s]*([\d\.]+\s*x?\s*10[\*\^]?\d+[/\s]*L)',
+            r'Red\s*Blood\s*Cell\s*Count\s*\(RBC\)[:.\s]*([\d\.]+)',
+            r'RBC\s*([\d\.]+)',
+        ],
+        'unit': 'x 10^12/L'
+    },
+    'Hemoglobin': {
+        'patterns': [
+            r'Hemoglobin[:.\s]*([\d\.]+\s*g[/\s]*dL)',
+            r'Hb[:.\s]*([\d\.]+\s*g[/\s]*dL)',
+            r'Hemoglobin\s*\(Hb\)[:.\s]*([\d\.]+)',
+        ],
+        'unit': 'g/dL'
+    },
+    'Hematocrit': {
+        'patterns': [
+            r'Hematocrit[:.\s]*([\d\.]+\s*%)',
+            r'Hct[:.\s]*([\d\.]+\s*%)',
+            r'Hematocrit\s*\(Hct\)[:.\s]*([\d\.]+)',
+        ],
+        'unit': '%'
+    },
+    'MCV': {
+        'patterns': [
+            r'MCV[:.\s]*([\d\.]+\s*fL)',
+            r'MCV\s*([\d\.]+)',
+            r'Mean\s*Cell\s*Volume\s*\(MCV\)[:.\s]*([\d\.]+)',
+        ],
+        'unit': 'fL'
+    },
+    'MCH': {
+        'patterns': [
+            r'MCH[:.\s]*([\d\.]+\s*pg)',
+            r'MCH\s*([\d\.]+)',
+            r'Mean\s*Cell\s*Hemoglobin\s*\(MCH\)[:.\s]*([\d\.]+)',
+        ],
+        'unit': 'pg'
+    },
+    'MCHC': {
+        'patterns': [
+            r'MCHC[:.\s]*([\d\.]+\s*g[/\s]*dL)',
+            r'MCHC\s*([\d\.]+)',
+            r'Mean\s*Cell\s*Hemoglobin\s*Concentration\s*\(MCHC\)[:.\s]*([\d\.]+)',
+        ],
+        'unit': 'g/dL'
+    },
+    'WBC': {
+        'patterns': [
+            r'WBC[:.\s]*([\d\.]+\s*x?\s*10[^\s]*[/\s]*L)',
+            r'White\s*Blood\s*Cell\s*Count\s*\(WBC\)[:.\s]*([\d\.]+)',
+            r'WBC\s*([\d\.]+)',
+        ],
+        'unit': 'x 10^9/L'
+    },
+    'Neutrophils': {
+        'patterns': [
+            r'Neutrophils[:.\s]*([\d\.]+\s*%)',
+            r'Neutrophils\s*([\d\.]+)',
+        ],
+        'unit': '%'
+    },
+    'Lymphocytes': {
+        'patterns': [
+            r'Lymphocytes[:.\s]*([\d\.]+\s*%)',
+            r'Lymphocytes\s*([\d\.]+)',
+        ],
+        'unit': '%'
+    },
+    'Monocytes': {
+        'patterns': [
+            r'Monocytes[:.\s]*([\d\.]+\s*%)',
+            r'Monocytes\s*([\d\.]+)',
+        ],
+        'unit': '%'
+    },
+    'Eosinophils': {
+        'patterns': [
+            r'Eosinophils[:.\s]*([\d\.]+\s*%)',
+            r'Eosinophils\s*([\d\.]+)',
+        ],
+        'unit': '%'
+    },
+    'Basophils': {
+        'patterns': [
+            r'Basophils[:.\s]*([\d\.]+\s*%)',
+            r'Basophils\s*([\d\.]+)',
+        ],
+        'unit': '%'
+    },
+    'Platelets': {
+        'patterns': [
+            r'Platelets[:.\s]*([\d\.]+\s*x?\s*10[\*\^]?\d+[/\s]*L)',
+            r'Platelet\s*Count[:.\s]*([\d\.]+)',
+            r'Platelets\s*([\d\.]+)',
+        ],
+        'unit': 'x 10^9/L'
+    },
+    'MPV': {
+        'patterns': [
+            r'MPV[:.\s]*([\d\.]+\s*fL)',
+            r'MPV\s*([\d\.]+)',
+        ],
+        'unit': 'fL'
+    },
+    'ESR': {
+        'patterns': [
+            r'ESR[:.\s]*([\d\.]+\s*mm[/\s]*hr)',
+            r'ESR\s*([\d\.]+)',
+        ],
+        'unit': 'mm/hr'
+    },
+}
+
+# The same parameters with their patterns compiled once at import
+_DEFAULT_FBC_PARAMS = {
+    param: {
+        'patterns': tuple(re.compile(pattern, re.IGNORECASE) for pattern in config['patterns']),
+        'unit': config['unit']
+    }
+    for param, config in _DEFAULT_FBC_SOURCES.items()
+}
+
+# Any unit-like text in an extracted default value (no unit is appended then)
+_UNIT_PRESENT = re.compile(r'x|10|%|g/dL|fL|pg|mm/hr')
+
+# Tabular FBC parameters: (row marker, parameter, value pattern, unit appended to the value)
+_TABULAR_NUMBER = re.compile(r'([\d\.]+)')
+_FBC_TABULAR = (
+    ('Red Blood Cell Count', 'RBC', _TABULAR_NUMBER, ' x 10^12/L'),
+    ('Hemoglobin', 'Hemoglobin', _TABULAR_NUMBER, ' g/dL'),
+    ('Hematocrit', 'Hematocrit', _TABULAR_NUMBER, ' %'),
+    ('MCV', 'MCV', _TABULAR_NUMBER, ' fL'),
+    ('MCH', 'MCH', _TABULAR_NUMBER, ' pg'),
+    ('MCHC', 'MCHC', _TABULAR_NUMBER, ' g/dL'),
+    ('WBC', 'WBC', _TABULAR_NUMBER, ' x 10^9/L'),
+    ('Platelets', 'Platelets', _TABULAR_NUMBER, ' x 10^9/L'),
+    ('MPV', 'MPV', _TABULAR_NUMBER, ' fL'),
+    ('ESR', 'ESR', _TABULAR_NUMBER, ' mm/hr'),
+)
+
+# The layouts BaseParser._extract_tabular_data expects, derived once from the table above
+_TABULAR_START_MARKERS = {marker: param for marker, param, _, _ in _FBC_TABULAR}
+_TABULAR_VALUE_PATTERNS = {param: (pattern,) for _, param, pattern, _ in _FBC_TABULAR}
+_TABULAR_UNITS = {param: unit for _, param, _, unit in _FBC_TABULAR}
 
 class FBCReportParser(BaseParser):
     def __init__(self, text, test_type_config=None):
@@ -21,32 +173,48 @@ class FBCReportParser(BaseParser):
             # Fallback to hardcoded FBC parameters
             self._extract_default_fbc_parameters()
         
-        # Try tabular extraction if we didn't find much data
-        if len([k for k in self.report_data.keys() if k not in ['Patient', 'Date', 'Doctor', 'Laboratory']]) < 5:
+        # Try tabular extraction if we didn't find much data and some tabular
+        # parameter is still missing (found ones are never overridden)
+        if (len(self.report_data.keys() - _META_FIELDS) < 5
+                and not self.report_data.keys() >= _TABULAR_VALUE_PATTERNS.keys()):
             self._extract_tabular_fbc_data()
     
     def _extract_configured_fields(self, report_fields, reference_ranges):
         """
         Extract fields based on database configuration.
         """
-        for field_config in report_fields:
-            field_name = field_config['name']
-            field_type = field_config.get('type', 'text')
-            unit = field_config.get('unit', '')
-            
-            # Generate patterns for this field
-            patterns = self._generate_field_patterns(field_name, unit)
-            
-            # Extract the field value
-            value = self._extract_numeric_value(self.text, patterns, unit)
-            
+        field_specs = tuple((field_config['name'], field_config.get('unit', '')) for field_config in report_fields)
+        
+        # Every field's patterns are located in one pass over the text
+        pattern_groups, union, lower_union = self._configured_patterns(field_specs)
+        values = self._extract_union(pattern_groups, union, lower_union)
+        
+        for (field_name, unit), value in zip(field_specs, values):
             if value:
+                # Add unit if missing
+                if unit and unit not in value:
+                    value += f' {unit}'
                 self.report_data[field_name] = value
-                print(f" Found configured field {field_name}: {value}", file=sys.stderr)
+                logger.debug(" Found configured field %s: %s", field_name, value)
             else:
-                print(f" Not found configured field {field_name}", file=sys.stderr)
+                logger.debug(" Not found configured field %s", field_name)
     
-    def _generate_field_patterns(self, field_name, unit=''):
+    @classmethod
+    @functools.lru_cache(maxsize=128)
+    def _configured_patterns(cls, field_specs):
+        """
+        Build the pattern groups and their union (plus its lowercase counterpart)
+        for (name, unit) field specs, once per configuration.
+        """
+        source_groups = [cls._generate_field_patterns(field_name, unit) for field_name, unit in field_specs]
+        pattern_groups = tuple(
+            tuple(_compile_linear(pattern, re.IGNORECASE) for pattern in patterns)
+            for patterns in source_groups
+        )
+        return pattern_groups, _union_of(source_groups), _union_of(source_groups, lowercase=True)
+    
+    @staticmethod
+    def _generate_field_patterns(field_name, unit=''):
         """
         Generate regex patterns for a field name.
         """
@@ -81,197 +249,38 @@ class FBCReportParser(BaseParser):
         """
         Fallback method using hardcoded FBC parameters.
         """
-        blood_params = {
-            'RBC': {
-                'patterns': [
-                    r'RBC[:.\s]*([\d\.]+\s*x?\s*10[\*\^]?\d+[/\s]*L)',
-                    r'Red\s*Blood\s*Cell\s*Count\s*\(RBC\)[:.\s]*([\d\.]+)',
-                    r'RBC\s*([\d\.]+)',
-                ],
-                'unit': 'x 10^12/L'
-            },
-            'Hemoglobin': {
-                'patterns': [
-                    r'Hemoglobin[:.\s]*([\d\.]+\s*g[/\s]*dL)',
-                    r'Hb[:.\s]*([\d\.]+\s*g[/\s]*dL)',
-                    r'Hemoglobin\s*\(Hb\)[:.\s]*([\d\.]+)',
-                ],
-                'unit': 'g/dL'
-            },
-            'Hematocrit': {
-                'patterns': [
-                    r'Hematocrit[:.\s]*([\d\.]+\s*%)',
-                    r'Hct[:.\s]*([\d\.]+\s*%)',
-                    r'Hematocrit\s*\(Hct\)[:.\s]*([\d\.]+)',
-                ],
-                'unit': '%'
-            },
-            'MCV': {
-                'patterns': [
-                    r'MCV[:.\s]*([\d\.]+\s*fL)',
-                    r'MCV\s*([\d\.]+)',
-                    r'Mean\s*Cell\s*Volume\s*\(MCV\)[:.\s]*([\d\.]+)',
-                ],
-                'unit': 'fL'
-            },
-            'MCH': {
-                'patterns': [
-                    r'MCH[:.\s]*([\d\.]+\s*pg)',
-                    r'MCH\s*([\d\.]+)',
-                    r'Mean\s*Cell\s*Hemoglobin\s*\(MCH\)[:.\s]*([\d\.]+)',
-                ],
-                'unit': 'pg'
-            },
-            'MCHC': {
-                'patterns': [
-                    r'MCHC[:.\s]*([\d\.]+\s*g[/\s]*dL)',
-                    r'MCHC\s*([\d\.]+)',
-                    r'Mean\s*Cell\s*Hemoglobin\s*Concentration\s*\(MCHC\)[:.\s]*([\d\.]+)',
-                ],
-                'unit': 'g/dL'
-            },
-            'WBC': {
-                'patterns': [
-                    r'WBC[:.\s]*([\d\.]+\s*x?\s*10[^\s]*[/\s]*L)',
-                    r'White\s*Blood\s*Cell\s*Count\s*\(WBC\)[:.\s]*([\d\.]+)',
-                    r'WBC\s*([\d\.]+)',
-                ],
-                'unit': 'x 10^9/L'
-            },
-            'Neutrophils': {
-                'patterns': [
-                    r'Neutrophils[:.\s]*([\d\.]+\s*%)',
-                    r'Neutrophils\s*([\d\.]+)',
-                ],
-                'unit': '%'
-            },
-            'Lymphocytes': {
-                'patterns': [
-                    r'Lymphocytes[:.\s]*([\d\.]+\s*%)',
-                    r'Lymphocytes\s*([\d\.]+)',
-                ],
-                'unit': '%'
-            },
-            'Monocytes': {
-                'patterns': [
-                    r'Monocytes[:.\s]*([\d\.]+\s*%)',
-                    r'Monocytes\s*([\d\.]+)',
-                ],
-                'unit': '%'
-            },
-            'Eosinophils': {
-                'patterns': [
-                    r'Eosinophils[:.\s]*([\d\.]+\s*%)',
-                    r'Eosinophils\s*([\d\.]+)',
-                ],
-                'unit': '%'
-            },
-            'Basophils': {
-                'patterns': [
-                    r'Basophils[:.\s]*([\d\.]+\s*%)',
-                    r'Basophils\s*([\d\.]+)',
-                ],
-                'unit': '%'
-            },
-            'Platelets': {
-                'patterns': [
-                    r'Platelets[:.\s]*([\d\.]+\s*x?\s*10[\*\^]?\d+[/\s]*L)',
-                    r'Platelet\s*Count[:.\s]*([\d\.]+)',
-                    r'Platelets\s*([\d\.]+)',
-                ],
-                'unit': 'x 10^9/L'
-            },
-            'MPV': {
-                'patterns': [
-                    r'MPV[:.\s]*([\d\.]+\s*fL)',
-                    r'MPV\s*([\d\.]+)',
-                ],
-                'unit': 'fL'
-            },
-            'ESR': {
-                'patterns': [
-                    r'ESR[:.\s]*([\d\.]+\s*mm[/\s]*hr)',
-                    r'ESR\s*([\d\.]+)',
-                ],
-                'unit': 'mm/hr'
-            },
-        }
-        
         # Extract blood parameters
-        for param, config in blood_params.items():
+        for param, config in _DEFAULT_FBC_PARAMS.items():
             patterns = config['patterns']
             unit = config['unit']
             
             for pattern in patterns:
-                match = re.search(pattern, self.text, re.IGNORECASE)
+                match = pattern.search(self.text)
                 if match:
                     value = match.group(1).strip()
                     
                     # Add units if missing
-                    if unit not in value and not any(u in value for u in ['x', '10', '%', 'g/dL', 'fL', 'pg', 'mm/hr']):
+                    if unit not in value and _UNIT_PRESENT.search(value) is None:
                         value += f' {unit}'
                     
                     self.report_data[param] = value
-                    print(f" Found {param}: {value}", file=sys.stderr)
+                    logger.debug(" Found %s: %s", param, value)
                     break
                 else:
-                    print(f" Not found {param} with pattern: {pattern}", file=sys.stderr)
+                    logger.debug(" Not found %s with pattern: %s", param, pattern.pattern)
     
     def _extract_tabular_fbc_data(self):
         """
         Extract FBC data from tabular format.
         """
-        print("=== TRYING TABULAR EXTRACTION ===", file=sys.stderr)
-        
-        lines = self.text.split('\n')
+        logger.debug("=== TRYING TABULAR EXTRACTION ===")
         
-        # Define markers for tabular data
-        start_markers = {
-            'Red Blood Cell Count': 'RBC',
-            'Hemoglobin': 'Hemoglobin',
-            'Hematocrit': 'Hematocrit',
-            'MCV': 'MCV',
-            'MCH': 'MCH',
-            'MCHC': 'MCHC',
-            'WBC': 'WBC',
-            'Platelets': 'Platelets',
-            'MPV': 'MPV',
-            'ESR': 'ESR'
-        }
-        
-        # Define value patterns for each parameter
-        value_patterns = {
-            'RBC': [r'([\d\.]+)'],
-            'Hemoglobin': [r'([\d\.]+)'],
-            'Hematocrit': [r'([\d\.]+)'],
-            'MCV': [r'([\d\.]+)'],
-            'MCH': [r'([\d\.]+)'],
-            'MCHC': [r'([\d\.]+)'],
-            'WBC': [r'([\d\.]+)'],
-            'Platelets': [r'([\d\.]+)'],
-            'MPV': [r'([\d\.]+)'],
-            'ESR': [r'([\d\.]+)']
-        }
-        
-        # Use base parser's tabular extraction method
-        tabular_data = self._extract_tabular_data(lines, start_markers, value_patterns)
-        
-        # Add units to extracted tabular data
-        unit_map = {
-            'RBC': ' x 10^12/L',
-            'Hemoglobin': ' g/dL',
-            'Hematocrit': ' %',
-            'MCV': ' fL',
-            'MCH': ' pg',
-            'MCHC': ' g/dL',
-            'WBC': ' x 10^9/L',
-            'Platelets': ' x 10^9/L',
-            'MPV': ' fL',
-            'ESR': ' mm/hr'
-        }
+        # Use base parser's tabular extraction method on the shared line split
+        # (which also lets it reuse the lowercased lines)
+        tabular_data = self._extract_tabular_data(self._lines, _TABULAR_START_MARKERS, _TABULAR_VALUE_PATTERNS)
         
         for param, value in tabular_data.items():
             if param not in self.report_data:  # Don't override existing data
-                final_value = value + unit_map.get(param, '')
+                final_value = value + _TABULAR_UNITS[param]
                 self.report_data[param] = final_value
-                print(f" Found tabular {param}: {final_value}", file=sys.stderr)
\ No newline at end of file
+                logger.debug(" Found tabular %s: %s", param, final_value)
\ No newline at end of file
@@ -1,3 +1,11 @@
+import re
+
+# A whole line (as str.splitlines() splits them) that contains one of the field keys.
+# The lookbehind only lets a match start at a line start, so each line is scanned once.
+_PATIENT_LINE = re.compile(
+    r'(?<![^\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029])[^\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]*(?:Name:|Age:|Gender:)[^\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]*'
+)
+
 class PatientDetailsParser:
     def __init__(self, document_text):
         self.document_text = document_text
@@ -7,8 +15,9 @@ class PatientDetailsParser:
         patient_details = {}
         
         # Example parsing logic (to be replaced with actual implementation)
-        lines = self.document_text.splitlines()
-        for line in lines:
+        # Only lines holding a key are visited; the rest are skipped by the regex engine
+        for line_match in _PATIENT_LINE.finditer(self.document_text):
+            line = line_match.group()
             if "Name:" in line:
                 patient_details["name"] = line.split("Name:")[1].strip()
             elif "Age:" in line:
@@ -1,3 +1,11 @@
+import re
+
+# A whole line (as str.splitlines() splits them) that contains one of the field keywords.
+# The lookbehind only lets a match start at a line start, so each line is scanned once.
+_PRESCRIPTION_LINE = re.compile(
+    r'(?<![^\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029])[^\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]*(?:Medication|Dosage|Frequency)[^\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]*'
+)
+
 class PrescriptionParser:
     def __init__(self, document_text):
         self.document_text = document_text
@@ -8,8 +16,9 @@ class PrescriptionParser:
         parsed_data = {}
         
         # Example parsing logic (to be replaced with actual implementation)
-        lines = self.document_text.splitlines()
-        for line in lines:
+        # Only lines holding a keyword are visited; the rest are skipped by the regex engine
+        for line_match in _PRESCRIPTION_LINE.finditer(self.document_text):
+            line = line_match.group()
             if "Medication" in line:
                 parsed_data["medication"] = line.split(":")[-1].strip()
             elif "Dosage" in line:
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+
+"""
+Tests for the shared extraction paths in base_parser
+Run with: python -m unittest test_base_parser
+"""
+
+import sys
+import os
+import re
+import logging
+import unittest
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import parser_factory
+import parser_fbc_report
+import parser_lab_report
+from base_parser import BaseParser, _compile, _lowercase_literals, _union_of
+from parser_fbc_report import FBCReportParser
+from parser_lab_report import LabReportParser
+
+# Small reports covering the labelled, tabular and piped layouts the parsers handle
+SAMPLE_REPORTS = {
+    'fbc': (
+        "CENTRAL MEDICAL LABORATORY\n"
+        "Patient: John Doe\n"
+        "Date: 2024-01-15\n"
+        "Doctor: Dr. Smith\n"
+        "FULL BLOOD COUNT\n"
+        "RBC: 4.8 x 10^12/L\n"
+        "Hemoglobin: 14.2 g/dL\n"
+        "Hematocrit: 42 %\n"
+        "MCV: 88 fL\n"
+        "WBC: 7.2 x 10^9/L\n"
+        "Platelets: 250 x 10^9/L\n"
+    ),
+    'fbc_table': (
+        "Patient Name: Jane Roe\n"
+        "Collection Date: 2024-02-01\n"
+        "Lab: City Lab\n"
+        "Red Blood Cell Count\n"
+        "4.6\n"
+        "Hemoglobin\n"
+        "13.9\n"
+        "Platelets\n"
+        "310\n"
+    ),
+    'lipid': (
+        "Patient: A B\n"
+        "Report Date: 3 March\n"
+        "Physician: Dr X\n"
+        "Total Cholesterol 195 mg/dL\n"
+        "HDL Cholesterol 52 mg/dL\n"
+        "LDL Cholesterol 110 mg/dL\n"
+        "Triglycerides: 140 mg/dL\n"
+        "Glucose: 95 mg/dL\n"
+    ),
+    'pipes': (
+        "Name: Sam\n"
+        "Date: 2024\n"
+        "| Test | Result | Reference | Units | Status |\n"
+        "| TSH | 3.1 | 0.4-4.0 | mIU/L | NORMAL |\n"
+        "| Free T4 | 1.1 | 0.8-1.8 | ng/dL | NORMAL |\n"
+        "Ferritin 45 (ng/mL)\n"
+        "Vitamin D: 30 ng/mL\n"
+    ),
+    'unicode': (
+        "Patient:\xa0Zoë Ångström\n"
+        "Date: 2024-03-01\n"
+        "TSH:\xa02.5 μIU/mL\n"
+        "Hemoglobin\v13.1 g/dL\n"
+    ),
+    'empty': "",
+}
+
+LIPID_CONFIG = {
+    'report_fields': [
+        {'name': 'Total_Cholesterol', 'type': 'number', 'unit': 'mg/dL'},
+        {'name': 'HDL_Cholesterol', 'type': 'number', 'unit': 'mg/dL'},
+        {'name': 'Triglycerides', 'type': 'number', 'unit': 'mg/dL'},
+    ]
+}
+
+
+def setUpModule():
+    # Several samples lack required fields; the parsers' warnings are expected here
+    logging.disable(logging.WARNING)
+
+
+def tearDownModule():
+    logging.disable(logging.NOTSET)
+
+
+class ParseManyTest(unittest.TestCase):
+
+    def test_matches_parsing_each_report(self):
+        texts = list(SAMPLE_REPORTS.values())
+        for parser_cls, config in ((LabReportParser, None), (LabReportParser, LIPID_CONFIG), (FBCReportParser, None)):
+            with self.subTest(parser=parser_cls.__name__, config=bool(config)):
+                expected = [parser_cls(text, config).parse() for text in texts]
+                self.assertEqual(parser_cls.parse_many(texts, config, workers=2), expected)
+
+    def test_chunked_batch(self):
+        # 48 reports on 2 workers go out in chunks of 6; order must survive the chunking
+        texts = list(SAMPLE_REPORTS.values()) * 8
+        expected = [FBCReportParser(text).parse() for text in texts]
+        self.assertEqual(FBCReportParser.parse_many(texts, workers=2), expected)
+
+    def test_single_worker(self):
+        texts = list(SAMPLE_REPORTS.values())
+        expected = [LabReportParser(text).parse() for text in texts]
+        self.assertEqual(LabReportParser.parse_many(iter(texts), workers=1), expected)
+
+
+class BasicFieldsTest(unittest.TestCase):
+
+    def test_fields_matching_at_same_offset(self):
+        config = {'basic_fields': [
+            {'name': 'Patient', 'patterns': [r'Name:\s*(\w+)']},
+            {'name': 'Ref', 'patterns': [r'Name:\s*\w+\s+(\d+)']},
+        ]}
+        self.assertEqual(LabReportParser("Name: John 1234", config).parse(), {'Patient': 'John', 'Ref': '1234'})
+
+    def test_hidden_pattern_keeps_priority(self):
+        # Ref's first pattern only matches where Patient's does; it still wins over the second
+        config = {'basic_fields': [
+            {'name': 'Patient', 'patterns': [r'Name:\s*(\w+)']},
+            {'name': 'Ref', 'patterns': [r'Name:\s*\w+\s+(\d+)', r'Ref:\s*(\d+)']},
+        ]}
+        text = "Ref: 99\nName: John 1234\nName: Bob 55"
+        self.assertEqual(LabReportParser(text, config).parse(), {'Patient': 'John', 'Ref': '1234'})
+
+
+# Pattern sources the lowercase rewrite must either handle exactly or refuse
+REWRITE_PATTERNS = (
+    r'Name:\s*(\w+)',
+    r'(?P<Name>Name):\s*(?P=Name)',
+    r'(?P<Value>[A-Z]+)\s+\d+',
+    r'[^A-Z\s]+',
+    r'[A-z]+',
+    r'[]A-C]+',
+    r'\x41BC',
+    r'\N{LATIN CAPITAL LETTER A}BC',
+    r'(a)\s+\1',
+    r'(?i)ABC',
+    r'(?-i:ABC)',
+    r'(?<=Name: )\w+',
+    r'(?:Ref|REF)\s*#?\s*(\d+)',
+    '\u212a',
+    '[\u017f]',
+)
+
+REWRITE_TEXTS = (
+    "Name: John 1234\nNAME: name\nREF # 55",
+    "abc ABC aBc [x]`_^ Z\\z K k S s",
+    "Name: Name a a A a",
+    "",
+)
+
+
+def _spans(matches):
+    return [match.regs for match in matches]
+
+
+class LowercaseRewriteTest(unittest.TestCase):
+
+    def test_rewrite_matches_ignorecase(self):
+        for source in REWRITE_PATTERNS:
+            rewritten = _lowercase_literals(source)
+            if rewritten is None:
+                continue
+            for text in REWRITE_TEXTS:
+                with self.subTest(pattern=source, text=text):
+                    self.assertEqual(
+                        _spans(re.finditer(rewritten, text.lower())),
+                        _spans(re.finditer(source, text, re.IGNORECASE)),
+                    )
+
+    def test_names_and_classes_are_rewritten(self):
+        self.assertEqual(_lowercase_literals(r'(?P<Name>Name):\s*(?P=Name)'), r'(?P<Name>name):\s*(?P=Name)')
+        self.assertEqual(_lowercase_literals(r'[^A-Z\s]+'), r'[^a-z\s]+')
+        self.assertEqual(_lowercase_literals(r'(?<=Name: )\w+'), r'(?<=name: )\w+')
+
+    def test_unsafe_patterns_are_refused(self):
+        for source in (r'[A-z]+', r'\x41BC', r'\N{LATIN CAPITAL LETTER A}BC', r'(a)\s+\1',
+                       r'(?-i:ABC)', '\u212a', '[\u017f]'):
+            with self.subTest(pattern=source):
+                self.assertIsNone(_lowercase_literals(source))
+        self.assertIsNone(_union_of([(r'Name', r'\x41')], lowercase=True))
+
+    def test_unsafe_basic_field_falls_back(self):
+        config = {'basic_fields': [
+            {'name': 'Patient', 'patterns': [r'\x4eame:\s*(\w+)']},
+            {'name': 'Code', 'patterns': [r'(?P<Code>[A-Z]{2})-\d+']},
+        ]}
+        self.assertEqual(LabReportParser("name: John AB-12", config).parse(), {'Patient': 'John', 'Code': 'AB'})
+
+
+# Texts for comparing the single-pass extraction paths with the per-pattern searches
+# they replace: repeated labels, fields matching at the same offset, markers on
+# consecutive lines and characters IGNORECASE equates with ASCII letters
+DIFFERENTIAL_TEXTS = list(SAMPLE_REPORTS.values()) + [
+    "Name: John 1234\nRef: 99",
+    "Ref: 99\nName: John 1234\nName: Bob 55",
+    "Patient: A\nPatient Name: B\nDate: 1\nCollection Date: 2\nDate: 3\n",
+    "Hemoglobin\nMCV\n88\n14.1\nHemoglobin 13.0\nPlatelets\n\n\n250\n",
+    "WBC 7.2\nRed Blood Cell Count: 4.5\nRBC\nMCHC MCH 33 29\n",
+    "\u017fodium: 140 mEq/L\nSodium: 141 mEq/L\n\u212aelvin TSH: 2 mIU/L\n",
+    "TSH 2.1 mIU/L\ntsh: 3.0 mIU/L\nFree T4 Index\n6.8\nglucose 95 mg/dL BUN 12 mg/dL\n",
+]
+
+# Basic field configurations beside the default one
+BASIC_FIELD_CONFIGS = (
+    [
+        {'name': 'Patient', 'patterns': [r'Name:\s*(\w+)']},
+        {'name': 'Ref', 'patterns': [r'Name:\s*\w+\s+(\d+)', r'Ref:\s*(\d+)']},
+    ],
+    [
+        {'name': 'Date', 'patterns': [r'Collection\s*Date:\s*(\S+)', r'Date:\s*(\S+)']},
+        {'name': 'Any Date', 'patterns': [r'Date:\s*(\S+)']},
+        {'name': 'Patient', 'patterns': [r'\x50atient(?:\s*Name)?:\s*(\w+)']},
+    ],
+)
+
+
+class _ReferenceParser(BaseParser):
+
+    def _extract_test_specific_data(self):
+        pass
+
+
+def _outcome(pattern, match):
+    return pattern.pattern, match.span(), match.groups()
+
+
+def _reference_tabular_data(lines, start_markers, value_patterns):
+    # The original per-line search: each marker line re-searches its own line and
+    # the next two for the parameter's value
+    extracted_data = {}
+    for i, line in enumerate(lines):
+        line = line.strip()
+        if not line:
+            continue
+        for marker, param_name in start_markers.items():
+            if marker.lower() in line.lower():
+                for j in range(i, min(i + 3, len(lines))):
+                    for pattern in value_patterns.get(param_name, [r'([\d\.]+)']):
+                        value_match = _compile(pattern).search(lines[j])
+                        if value_match and (j > i or marker.lower() not in lines[j].lower()):
+                            extracted_data[param_name] = value_match.group(1)
+                            break
+                    if param_name in extracted_data:
+                        break
+                break
+    return extracted_data
+
+
+class SinglePassParityTest(unittest.TestCase):
+
+    def test_basic_fields_match_per_pattern_search(self):
+        field_sets = [BaseParser._DEFAULT_BASIC_FIELDS_COMPILED]
+        field_sets += [BaseParser._compile_basic_fields(fields) for fields in BASIC_FIELD_CONFIGS]
+        for compiled_fields in field_sets:
+            for text in DIFFERENTIAL_TEXTS:
+                with self.subTest(fields=[name for name, _, _ in compiled_fields], text=text):
+                    expected = {}
+                    for field_index, (_, _, patterns) in enumerate(compiled_fields):
+                        for pattern in patterns:
+                            match = pattern.search(text)
+                            if match:
+                                expected[field_index] = _outcome(pattern, match)
+                                break
+                    located = _ReferenceParser(text)._locate_basic_fields(compiled_fields)
+                    self.assertEqual({index: _outcome(*hit) for index, hit in located.items()}, expected)
+
+    def test_union_matches_numeric_value_search(self):
+        cases = [
+            (parser_lab_report._DEFAULT_LAB_GROUPS, parser_lab_report._DEFAULT_LAB_UNION,
+             parser_lab_report._DEFAULT_LAB_LOWER_UNION),
+            (tuple(parser_lab_report._TABLE_THYROID_PATTERNS.values()), parser_lab_report._TABLE_THYROID_UNION,
+             parser_lab_report._TABLE_THYROID_LOWER_UNION),
+        ]
+        for name in ('_THYROID', '_FBC', '_LAB'):
+            groups = tuple(getattr(parser_factory, name + '_PATTERNS').values())
+            cases.append((groups, getattr(parser_factory, name + '_UNION'), None))
+        for groups, union, lower_union in cases:
+            for text in DIFFERENTIAL_TEXTS:
+                with self.subTest(union=union.pattern[:40], text=text):
+                    parser = _ReferenceParser(text)
+                    expected = [parser._extract_numeric_value(text, patterns) for patterns in groups]
+                    self.assertEqual(parser._extract_union(groups, union, lower_union), expected)
+
+    def test_tabular_data_matches_line_search(self):
+        cases = [
+            (parser_fbc_report._TABULAR_START_MARKERS, parser_fbc_report._TABULAR_VALUE_PATTERNS),
+            # Overlapping markers and a parameter without value patterns
+            ({'MCH': 'MCH', 'MCHC': 'MCHC', 'Count': 'Count'}, {'MCHC': (r'(\d+)\s*$',)}),
+        ]
+        for start_markers, value_patterns in cases:
+            for text in DIFFERENTIAL_TEXTS:
+                with self.subTest(markers=list(start_markers), text=text):
+                    parser = _ReferenceParser(text)
+                    expected = _reference_tabular_data(parser._lines, start_markers, value_patterns)
+                    self.assertEqual(parser._extract_tabular_data(parser._lines, start_markers, value_patterns), expected)
+                    lines = text.split('\n')
+                    self.assertEqual(parser._extract_tabular_data(lines, start_markers, value_patterns), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
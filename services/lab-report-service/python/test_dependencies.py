@@ -4,8 +4,50 @@ Simple test script to check if Python dependencies are available
 This script will be used to test the Python environment before running the main extractor
 """
 
+import os
 import sys
 import json
+import tempfile
+import importlib.util
+
+# Results of the last probe, reused while the interpreter and the installed modules are unchanged
+CACHE_PATH = os.path.join(tempfile.gettempdir(), '.medilink_deps.json')
+PROBED_MODULES = ('pdf2image', 'pytesseract', 'PIL')
+
+def _cache_key():
+    """Identify the environment: interpreter plus location and mtime of each probed module"""
+    key = [sys.version, sys.executable]
+    for name in PROBED_MODULES:
+        try:
+            spec = importlib.util.find_spec(name)
+            origin = spec.origin if spec else None
+            key.append([name, origin, os.path.getmtime(origin) if origin else None])
+        except (ImportError, ValueError, OSError):
+            key.append([name, None, None])
+    return key
+
+def cached_test_dependencies():
+    """test_dependencies(), answered from the on-disk cache when the environment is unchanged"""
+    key = _cache_key()
+    try:
+        with open(CACHE_PATH) as cache_file:
+            cached = json.load(cache_file)
+        if cached.get("key") == key:
+            return cached["results"]
+    except (OSError, ValueError, AttributeError, KeyError):
+        pass
+    
+    results = test_dependencies()
+    temp_path = None
+    try:
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(CACHE_PATH), suffix='.tmp')
+        with os.fdopen(fd, 'w') as cache_file:
+            json.dump({"key": key, "results": results}, cache_file)
+        os.replace(temp_path, CACHE_PATH)
+    except OSError:
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
+    return results
 
 def test_dependencies():
     """Test if all required dependencies are available"""
@@ -47,7 +89,7 @@ def test_dependencies():
 
 if __name__ == "__main__":
     try:
-        test_results = test_dependencies()
+        test_results = cached_test_dependencies()
         print(json.dumps(test_results, indent=2))
         
         # Exit with error code if dependencies are missing
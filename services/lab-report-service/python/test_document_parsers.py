@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+"""
+Tests for the patient details and prescription parsers
+Run with: python -m unittest test_document_parsers
+"""
+
+import sys
+import os
+import time
+import random
+import string
+import unittest
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from parser_patient_details import PatientDetailsParser
+from parser_prescription import PrescriptionParser
+
+# Line breaks str.splitlines() splits on, between keyed and unkeyed lines
+DOCUMENT_TEXTS = (
+    "Name: John Doe\nAge: 42\nGender: M\n",
+    "Patient Name: Jane\r\nAge: 30\r\nNotes\x0bGender: F Age: 31",
+    "Medication: Amoxicillin\nDosage: 500 mg\nFrequency: twice daily\n",
+    "Medication Dosage: 1 tablet\x1cFrequency:\x85Frequency: daily\rMedication: none",
+    "",
+)
+
+
+def _reference_patient_details(text):
+    # The original line loop
+    patient_details = {}
+    for line in text.splitlines():
+        if "Name:" in line:
+            patient_details["name"] = line.split("Name:")[1].strip()
+        elif "Age:" in line:
+            patient_details["age"] = line.split("Age:")[1].strip()
+        elif "Gender:" in line:
+            patient_details["gender"] = line.split("Gender:")[1].strip()
+    return patient_details
+
+
+def _reference_prescription(text):
+    # The original line loop
+    parsed_data = {}
+    for line in text.splitlines():
+        if "Medication" in line:
+            parsed_data["medication"] = line.split(":")[-1].strip()
+        elif "Dosage" in line:
+            parsed_data["dosage"] = line.split(":")[-1].strip()
+        elif "Frequency" in line:
+            parsed_data["frequency"] = line.split(":")[-1].strip()
+    return parsed_data
+
+
+def _long_document(keyed_lines, line_length=1000, line_count=200):
+    # Random lines without any key, with the keyed lines in the middle
+    rng = random.Random(0)
+    alphabet = string.ascii_lowercase + string.digits + ' .,'
+    lines = [''.join(rng.choice(alphabet) for _ in range(line_length)) for _ in range(line_count)]
+    lines[line_count // 2:line_count // 2] = keyed_lines
+    return '\n'.join(lines)
+
+
+class DocumentParsersTest(unittest.TestCase):
+
+    def test_matches_line_loop(self):
+        for text in DOCUMENT_TEXTS:
+            with self.subTest(text=text):
+                self.assertEqual(PatientDetailsParser(text).parse(), _reference_patient_details(text))
+                self.assertEqual(PrescriptionParser(text).parse(), _reference_prescription(text))
+
+    def test_long_lines_without_keys(self):
+        # Each line must be scanned once; retrying from every offset took seconds here
+        cases = (
+            (PatientDetailsParser, _long_document(["Name: John", "Age: 42"]), {"name": "John", "age": "42"}),
+            (PrescriptionParser, _long_document(["Medication: A", "Dosage: 5 mg"]), {"medication": "A", "dosage": "5 mg"}),
+        )
+        for parser_cls, text, expected in cases:
+            with self.subTest(parser=parser_cls.__name__):
+                started = time.perf_counter()
+                self.assertEqual(parser_cls(text).parse(), expected)
+                self.assertLess(time.perf_counter() - started, 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,6 +12,9 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from db_helper import db_helper
 from parser_factory import parser_factory
 
+# Report text used to instantiate each new test type's parser
+SAMPLE_TEXT = "Sample medical report text for testing"
+
 def test_new_test_types():
     """Test how system handles newly created test types"""
     
@@ -21,27 +24,29 @@ def test_new_test_types():
     new_test_types = [9, 15, 25, 50, 100, 150]
     
     for test_type_id in new_test_types:
-        print(f"--- Testing Test Type ID: {test_type_id} ---")
+        # Each test type's report is collected and printed in one write
+        lines = [f"--- Testing Test Type ID: {test_type_id} ---"]
         
         # Get configuration for new test type
         config = db_helper.get_test_type_config(test_type_id)
         
-        print(f"✅ Config Generated:")
-        print(f"   ID: {config['id']}")
-        print(f"   Label: {config['label']}")
-        print(f"   Category: {config['category']}")
-        print(f"   Parser: {config['parser_module']}.{config['parser_class']}")
-        print(f"   Fields: {len(config['report_fields'])} configured")
+        lines += [
+            f"✅ Config Generated:",
+            f"   ID: {config['id']}",
+            f"   Label: {config['label']}",
+            f"   Category: {config['category']}",
+            f"   Parser: {config['parser_module']}.{config['parser_class']}",
+            f"   Fields: {len(config['report_fields'])} configured",
+        ]
         
         # Test parser creation
         try:
-            sample_text = "Sample medical report text for testing"
-            parser = parser_factory.create_parser(sample_text, config)
-            print(f"✅ Parser Created: {parser.__class__.__name__}")
+            parser = parser_factory.create_parser(SAMPLE_TEXT, config)
+            lines.append(f"✅ Parser Created: {parser.__class__.__name__}")
         except Exception as e:
-            print(f"❌ Parser Creation Failed: {str(e)}")
+            lines.append(f"❌ Parser Creation Failed: {str(e)}")
         
-        print()
+        print('\n'.join(lines), end='\n\n')
 
 def test_known_vs_unknown_types():
     """Compare known test types vs unknown test types"""
@@ -66,42 +71,42 @@ def test_known_vs_unknown_types():
     
     print()
 
+# This is what would happen with real database:
+SIMULATED_DB_RESPONSE = {
+    'id': 25,
+    'value': 'cardiac_markers',
+    'label': 'Cardiac Markers Panel',
+    'category': 'cardiology',
+    'parser_module': 'parser_lab_report',
+    'parser_class': 'LabReportParser',
+    'report_fields': [
+        {'name': 'Troponin I', 'type': 'decimal', 'required': True, 'unit': 'ng/mL', 'normalRange': '<0.04'},
+        {'name': 'CK-MB', 'type': 'decimal', 'required': True, 'unit': 'ng/mL', 'normalRange': '0-6.3'},
+        {'name': 'BNP', 'type': 'decimal', 'required': False, 'unit': 'pg/mL', 'normalRange': '<100'},
+    ],
+    'reference_ranges': {
+        'Troponin I': {'max': 0.04, 'unit': 'ng/mL', 'normalRange': '<0.04'},
+        'CK-MB': {'min': 0, 'max': 6.3, 'unit': 'ng/mL', 'normalRange': '0-6.3'},
+        'BNP': {'max': 100, 'unit': 'pg/mL', 'normalRange': '<100'}
+    }
+}
+
 def simulate_database_driven_config():
     """Simulate how it would work with real database integration"""
     
     print("=== SIMULATING TRUE DATABASE INTEGRATION ===\n")
     
-    # This is what would happen with real database:
-    simulated_db_response = {
-        'id': 25,
-        'value': 'cardiac_markers',
-        'label': 'Cardiac Markers Panel',
-        'category': 'cardiology',
-        'parser_module': 'parser_lab_report',
-        'parser_class': 'LabReportParser',
-        'report_fields': [
-            {'name': 'Troponin I', 'type': 'decimal', 'required': True, 'unit': 'ng/mL', 'normalRange': '<0.04'},
-            {'name': 'CK-MB', 'type': 'decimal', 'required': True, 'unit': 'ng/mL', 'normalRange': '0-6.3'},
-            {'name': 'BNP', 'type': 'decimal', 'required': False, 'unit': 'pg/mL', 'normalRange': '<100'},
-        ],
-        'reference_ranges': {
-            'Troponin I': {'max': 0.04, 'unit': 'ng/mL', 'normalRange': '<0.04'},
-            'CK-MB': {'min': 0, 'max': 6.3, 'unit': 'ng/mL', 'normalRange': '0-6.3'},
-            'BNP': {'max': 100, 'unit': 'pg/mL', 'normalRange': '<100'}
-        }
-    }
-    
     print("🎯 With True Database Integration:")
     print(f"   - Admin creates new test type in UI")
-    print(f"   - Database stores: {simulated_db_response['label']}")
-    print(f"   - Parser automatically gets: {len(simulated_db_response['report_fields'])} specific fields")
+    print(f"   - Database stores: {SIMULATED_DB_RESPONSE['label']}")
+    print(f"   - Parser automatically gets: {len(SIMULATED_DB_RESPONSE['report_fields'])} specific fields")
     print(f"   - No code changes needed!")
     print(f"   - Field extraction works immediately")
     
     # Test parser creation with simulated config
     try:
         sample_text = "Troponin I: 0.02 ng/mL NORMAL"
-        parser = parser_factory.create_parser(sample_text, simulated_db_response)
+        parser = parser_factory.create_parser(sample_text, SIMULATED_DB_RESPONSE)
         print(f"✅ Parser works: {parser.__class__.__name__}")
     except Exception as e:
         print(f"❌ Parser failed: {str(e)}")
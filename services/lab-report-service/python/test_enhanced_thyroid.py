@@ -12,11 +12,8 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from parser_factory import parser_factory
 from db_helper import db_helper
 
-def test_enhanced_thyroid_extraction():
-    """Test enhanced thyroid pattern extraction with actual OCR text"""
-    
-    # Actual OCR text from user's report
-    ocr_text = '''
+# Actual OCR text from user's report
+OCR_TEXT = '''
 ENDOCRINE DIAGNOSTICS LABORATORY
 
 789 Medical Research Center, Building A
@@ -93,8 +90,11 @@ T4:T3 Ratio 4.1 2.5 - 5.0 ratio NORMAL
 Free T4 Index (FTI) 6.8 4.5 - 10.5 index NORMAL
 '''
 
+def test_enhanced_thyroid_extraction():
+    """Test enhanced thyroid pattern extraction with actual OCR text"""
+    
     print("=== ENHANCED THYROID EXTRACTION TEST ===")
-    print(f"OCR text length: {len(ocr_text)}")
+    print(f"OCR text length: {len(OCR_TEXT)}")
     
     # Test Type ID 6 should map to Thyroid Function Test
     test_type_id = 6
@@ -105,7 +105,7 @@ Free T4 Index (FTI) 6.8 4.5 - 10.5 index NORMAL
     print(f"=== CONFIG: {config.get('name', 'Unknown')} ===")
     
     # Create parser
-    parser = parser_factory.create_parser(ocr_text, config)
+    parser = parser_factory.create_parser(OCR_TEXT, config)
     if not parser:
         print("❌ Failed to create parser")
         return False
@@ -131,20 +131,23 @@ Free T4 Index (FTI) 6.8 4.5 - 10.5 index NORMAL
         correct_results = 0
         total_thyroid_fields = 0
         
+        # Collect the per-field lines and print them together
+        lines = []
         for field, expected in expected_results.items():
-            if field in result:
-                total_thyroid_fields += 1
-                extracted = result[field]
-                print(f"✅ {field}: '{extracted}'", end="")
-                
-                # Check if we got the correct result (not reference range)
-                if expected in extracted:
-                    print(f" ✅ CORRECT (expected: {expected})")
-                    correct_results += 1
-                else:
-                    print(f" ❌ WRONG (expected: {expected}, got range?)")
+            extracted = result.get(field)
+            if extracted is None:
+                lines.append(f"❌ {field}: NOT FOUND")
+                continue
+            
+            total_thyroid_fields += 1
+            
+            # Check if we got the correct result (not reference range)
+            if expected in extracted:
+                lines.append(f"✅ {field}: '{extracted}' ✅ CORRECT (expected: {expected})")
+                correct_results += 1
             else:
-                print(f"❌ {field}: NOT FOUND")
+                lines.append(f"✅ {field}: '{extracted}' ❌ WRONG (expected: {expected}, got range?)")
+        print('\n'.join(lines))
         
         print(f"\n=== SUMMARY ===")
         print(f"🎯 Correct Results: {correct_results}/{total_thyroid_fields}")
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+
+"""
+Parity tests for the optional RE2 engine: patterns compiled for RE2 must match
+exactly as the re module does, on ASCII and non-ASCII text alike.
+The parity checks are skipped unless google-re2 is installed.
+Run with: python -m unittest test_regex_engines
+"""
+
+import sys
+import os
+import re
+import json
+import unittest
+import subprocess
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import base_parser
+from base_parser import BaseParser, _compile_linear, _re2_source
+from test_base_parser import SAMPLE_REPORTS, _ReferenceParser
+
+# Lines exercising what RE2 and re disagree on: Unicode and ASCII-only control
+# whitespace, Unicode digits and a trailing newline
+PARITY_TEXTS = list(SAMPLE_REPORTS.values()) + [
+    "TSH 2.1 0.4 - 4.0 mIU/L\n",
+    "TSH:\xa02.1 mIU/L",
+    "TSH:\v2.1 mIU/L",
+    "TSH:\x1c2.1 mIU/L",
+    "TSH: ٣.1 mIU/L",
+    "| TSH | 2.1 | 0.4-4.0 | mIU/L | NORMAL |",
+    "Hemoglobin  13.9 g/dL\r\nPlatelets 310 x 10^9/L\n",
+    "Free T4 Index (FTI) 6.8 4.5 - 10.5 index NORMAL\n",
+    "Total Cholesterol\n195 mg/dL",
+    "",
+]
+
+# Field names the generated table patterns are built for
+TABLE_FIELDS = (
+    ('TSH', 'mIU/L', 'number'),
+    ('Hemoglobin', 'g/dL', 'decimal'),
+    ('Total Cholesterol', 'mg/dL', 'number'),
+    ('Platelets', '', 'number'),
+    ('Status', '', 'text'),
+)
+
+
+def _outcome(match):
+    return None if match is None else (match.span(), match.groups())
+
+
+class Re2SourceTest(unittest.TestCase):
+
+    def test_whitespace_class_matches_re(self):
+        self.assertEqual(_re2_source(r'a\sb'), r'a[\t\n\v\f\r \x1c-\x1f]b')
+        self.assertEqual(_re2_source(r'[\s\d]'), r'[\t\n\v\f\r \x1c-\x1f\d]')
+        self.assertEqual(_re2_source(r'\S+'), r'[^\t\n\v\f\r \x1c-\x1f]+')
+
+    def test_unsupported_constructs_stay_on_re(self):
+        for pattern in (r'x$', r'a{,3}', r'\x41', r'\N{MICRO SIGN}', r'(a)\1', r'a\Z', r'[\S]', r'[[:alpha:]]'):
+            with self.subTest(pattern=pattern):
+                self.assertIsNone(_re2_source(pattern))
+
+    def test_multiline_dollar_is_kept(self):
+        self.assertEqual(_re2_source(r'(?m)^a$'), r'(?m)^a$')
+
+    def test_disabled_by_default(self):
+        if os.getenv('MEDILINK_RE2') != '1':
+            self.assertFalse(base_parser._USE_RE2)
+            self.assertIsInstance(_compile_linear(r'a\sb', re.IGNORECASE), re.Pattern)
+
+
+@unittest.skipIf(base_parser.re2 is None, "google-re2 is not installed")
+class PatternParityTest(unittest.TestCase):
+
+    def assert_same_matches(self, source, flags=re.IGNORECASE):
+        reference = re.compile(source, flags)
+        pattern = _compile_linear(source, flags, use_re2=True)
+        for text in PARITY_TEXTS:
+            with self.subTest(pattern=source, text=text):
+                self.assertEqual(_outcome(pattern.search(text)), _outcome(reference.search(text)))
+                self.assertEqual(
+                    [_outcome(match) for match in pattern.finditer(text)],
+                    [_outcome(match) for match in reference.finditer(text)],
+                )
+                for position in range(len(text) + 1):
+                    self.assertEqual(_outcome(pattern.match(text, position)), _outcome(reference.match(text, position)))
+
+    def test_table_row_patterns(self):
+        for source, _ in BaseParser._TABLE_ROW_SOURCES:
+            self.assert_same_matches(source)
+
+    def test_generated_table_patterns(self):
+        for field in TABLE_FIELDS:
+            for pattern in BaseParser._generate_table_patterns(*field):
+                self.assert_same_matches(pattern.pattern)
+
+    def test_non_ascii_literals(self):
+        # IGNORECASE equates the long s and the Kelvin sign with ASCII letters
+        for source in (r'TSH[:\s]*([\d.]+)\s*(?:mIU/L|μIU/mL)', '\u017f', '\u212a'):
+            self.assert_same_matches(source)
+
+    def test_table_rows_extraction(self):
+        for text in PARITY_TEXTS:
+            with self.subTest(text=text):
+                parser = _ReferenceParser(text)
+                expected = parser._extract_table_rows(text, expected=set())
+                linear_patterns = tuple((_compile_linear(source, re.IGNORECASE, use_re2=True), single)
+                                        for source, single in BaseParser._TABLE_ROW_SOURCES)
+                parser._TABLE_ROW_PATTERNS = linear_patterns
+                self.assertEqual(parser._extract_table_rows(text, expected=set()), expected)
+
+
+# Parses stdin's [module, class, config, texts] and prints the results as JSON;
+# run in a fresh interpreter, since the parsers compile their patterns at import
+_PARSE_SCRIPT = """
+import importlib, json, logging, sys
+logging.disable(logging.WARNING)
+module_name, class_name, config, texts = json.load(sys.stdin)
+parser_cls = getattr(importlib.import_module(module_name), class_name)
+json.dump([parser_cls(text, config).parse() for text in texts], sys.stdout)
+"""
+
+
+def _parse_all(module_name, class_name, config, use_re2):
+    result = subprocess.run(
+        [sys.executable, '-c', _PARSE_SCRIPT],
+        input=json.dumps([module_name, class_name, config, PARITY_TEXTS]),
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=dict(os.environ, MEDILINK_RE2='1' if use_re2 else '0'),
+        check=True
+    )
+    return json.loads(result.stdout)
+
+
+@unittest.skipIf(base_parser.re2 is None, "google-re2 is not installed")
+class ParserParityTest(unittest.TestCase):
+
+    def assert_same_results(self, module_name, class_name, config=None):
+        self.assertEqual(
+            _parse_all(module_name, class_name, config, use_re2=True),
+            _parse_all(module_name, class_name, config, use_re2=False),
+        )
+
+    def test_generic_parser(self):
+        self.assert_same_results('parser_factory', 'GenericParser')
+        self.assert_same_results('parser_factory', 'GenericParser', {'report_fields': [
+            {'name': 'TSH', 'type': 'decimal', 'unit': 'mIU/L'},
+            {'name': 'Hemoglobin', 'type': 'number', 'unit': 'g/dL'},
+            {'name': 'Status', 'type': 'text'},
+        ]})
+
+    def test_lab_report_parser(self):
+        self.assert_same_results('parser_lab_report', 'LabReportParser')
+        self.assert_same_results('parser_lab_report', 'LabReportParser', {'report_fields': [
+            {'name': 'TSH', 'type': 'number', 'unit': 'mIU/L'},
+            {'name': 'Free_T4', 'type': 'number', 'unit': 'ng/dL'},
+            {'name': 'Total_Cholesterol', 'type': 'number', 'unit': 'mg/dL'},
+            {'name': 'Hemoglobin', 'type': 'number', 'unit': 'g/dL'},
+        ]})
+
+    def test_fbc_report_parser(self):
+        self.assert_same_results('parser_fbc_report', 'FBCReportParser')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+
+"""
+Tests for the page image preprocessing in utils
+Run with: python -m unittest test_utils
+"""
+
+import sys
+import os
+import unittest
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    from PIL import Image
+    import utils
+except ImportError:
+    utils = None
+
+
+def _synthetic_page():
+    # Light gray paper (200) with a block of dark gray "ink" (60)
+    image = Image.new('L', (64, 32), 200)
+    image.paste(60, (8, 8, 40, 24))
+    return image
+
+
+def _levels(image):
+    # Pixel values present in an 'L' image
+    return {level for level, count in enumerate(image.histogram()) if count}
+
+
+@unittest.skipIf(utils is None, "Pillow is not installed")
+class PreprocessImageTest(unittest.TestCase):
+
+    def test_fixed_threshold_is_default(self):
+        if os.getenv('OCR_THRESHOLD', 'fixed').lower() != 'otsu':
+            self.assertEqual(utils.THRESHOLD_METHOD, 'fixed')
+
+    def test_fixed_threshold(self):
+        binary = utils.preprocess_image(_synthetic_page(), method='fixed')
+        self.assertEqual(binary.mode, '1')
+        self.assertEqual(binary.getpixel((0, 0)), 255)
+        self.assertEqual(binary.getpixel((20, 16)), 0)
+
+    @unittest.skipIf(utils is None or utils.cv2 is None, "OpenCV is not installed")
+    def test_otsu_threshold(self):
+        binary = utils.preprocess_image(_synthetic_page(), method='otsu')
+        self.assertEqual(binary.mode, 'L')
+        self.assertEqual(_levels(binary), {0, 255})
+        self.assertEqual(binary.getpixel((0, 0)), 255)
+        self.assertEqual(binary.getpixel((20, 16)), 0)
+
+    @unittest.skipIf(utils is None or utils.cv2 is None, "OpenCV is not installed")
+    def test_otsu_threshold_converts_rgb(self):
+        binary = utils.preprocess_image(_synthetic_page().convert('RGB'), method='otsu')
+        self.assertEqual(binary.mode, 'L')
+        self.assertEqual(_levels(binary), {0, 255})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,22 +1,59 @@
-def preprocess_image(image):
-    # Convert the image to grayscale
-    gray_image = image.convert('L')
+import os
+
+from PIL import Image
+
+try:
+    # Optional: OpenCV picks a threshold per page (Otsu) instead of the fixed 128
+    import cv2
+    import numpy as np
+except ImportError:
+    cv2 = None
+
+# Binarization method: 'fixed' (threshold 128, the default) or 'otsu', which needs
+# OpenCV and stays opt-in (OCR_THRESHOLD=otsu) until its OCR output is validated
+THRESHOLD_METHOD = 'otsu' if os.getenv('OCR_THRESHOLD', 'fixed').lower() == 'otsu' and cv2 is not None else 'fixed'
+
+def preprocess_image(image, method=None):
+    if (method or THRESHOLD_METHOD) == 'otsu':
+        gray_image = image if image.mode == 'L' else image.convert('L')
+        
+        # Otsu's method chooses the level that best separates ink from paper on this
+        # page, so faint or dark scans binarize cleanly; the result is a 0/255 'L' image
+        _, binary = cv2.threshold(np.asarray(gray_image), 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+        return Image.fromarray(binary)
     
-    # Apply thresholding to get a binary image
-    binary_image = gray_image.point(lambda x: 0 if x < 128 else 255, '1')
+    # Convert the image to grayscale unless Pillow can threshold it directly
+    # (pages are usually rendered grayscale already)
+    if image.mode not in ('L', 'RGB'):
+        image = image.convert('L')
+    
+    # Apply thresholding to get a binary image: undithered conversion to '1'
+    # sets every pixel below 128 to black in one pass
+    binary_image = image.convert('1', dither=Image.Dither.NONE)
     
     return binary_image
 
 def resize_image(image, width):
-    # Calculate the height based on the aspect ratio
-    aspect_ratio = image.height / image.width
-    height = int(aspect_ratio * width)
+    # Calculate the height based on the aspect ratio (integer math, so it is
+    # exact rather than subject to float rounding)
+    height = image.height * width // image.width
     
-    # Resize the image
-    resized_image = image.resize((width, height))
+    # Resize the image (bilinear: a smaller kernel than the default bicubic,
+    # which is plenty for OCR input)
+    resized_image = image.resize((width, height), resample=Image.Resampling.BILINEAR)
     
     return resized_image
 
-def save_image(image, path):
+# Save options per format: processed images are short-lived OCR inputs, so fast
+# writes matter more than small files
+_FAST_SAVE_OPTIONS = {
+    'PNG': {'optimize': False, 'compress_level': 1},
+}
+
+def save_image(image, path, image_format=None):
+    # Use the given format, or the one the path's extension names
+    if image_format is None:
+        image_format = Image.registered_extensions().get(os.path.splitext(path)[1].lower())
+    
     # Save the processed image to the specified path
-    image.save(path)
\ No newline at end of file
+    image.save(path, format=image_format, **_FAST_SAVE_OPTIONS.get(image_format, {}))